@@ -105,8 +105,11 @@ def run_batch_backtest():
         import pandas as pd
         from datetime import datetime
         
-        # 添加 src 路徑到系統路徑
-        sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+        # 已安裝時走一般匯入；原始 checkout 才補上 src/ 路徑
+        try:
+            import macd_strategy  # noqa: F401
+        except ImportError:
+            sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
         
         from macd_strategy.backtest import run_backtest
         from macd_strategy.core import config
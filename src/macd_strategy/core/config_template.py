@@ -33,6 +33,7 @@ POSITION_SIZE = 0.05
 LEVERAGE = 50  # 預設槓桿，實際會根據持倉價值動態調整
 MARGIN_MODE = "isolated"
 MAINTENANCE_MARGIN_RATIO = 0.05  # 預設維持保證金比率，實際會動態調整
+POSITION_HISTORY_MAX = 1000  # 記憶體中保留的已平倉交易上限（無限監控模式防止無界成長）
 
 # 日誌配置
 LOG_LEVEL = "INFO"
@@ -0,0 +1,19 @@
+"""
+Numba JIT 編譯支援模組
+numba 為可選加速依賴，未安裝時自動退回純 Python 實作
+"""
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """numba.njit 的替代裝飾器（無 numba 時直接返回原函數）"""
+        if args and callable(args[0]):
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
@@ -3,8 +3,54 @@
 根據持倉價值動態計算可用槓桿和維持保證金比率
 """
 
+from bisect import bisect_right
+from functools import lru_cache
 from typing import Dict, Tuple
+
+import numpy as np
+
 from . import config
+from .jit import njit
+
+# 槓桿分級表 import 時凍結成 tuple：級別字典本身可重複回傳
+# （無每次呼叫的配置成本），tuple 亦防止執行期誤改表
+_BRACKETS = tuple(config.BINANCE_LEVERAGE_BRACKETS)
+
+# 槓桿分級表的欄狀（SoA）視圖：import 時建一次，
+# 查表以 searchsorted 二分取代逐級線性掃描
+_BRACKET_CAPS = np.array(
+    [b["notional_max"] for b in config.BINANCE_LEVERAGE_BRACKETS], dtype=np.float64
+)
+_BRACKET_MAX_LEV = np.array(
+    [b["max_leverage"] for b in config.BINANCE_LEVERAGE_BRACKETS], dtype=np.int32
+)
+_BRACKET_MMR = np.array(
+    [b["maintenance_margin_rate"] for b in config.BINANCE_LEVERAGE_BRACKETS], dtype=np.float64
+)
+_BRACKET_MAINT = np.array(
+    [b["maintenance_amount"] for b in config.BINANCE_LEVERAGE_BRACKETS], dtype=np.float64
+)
+# 純量查詢用的上限 tuple（bisect 對 Python 純量比 numpy 陣列快）
+_BRACKET_CAPS_LIST = tuple(float(c) for c in _BRACKET_CAPS)
+
+
+@lru_cache(maxsize=512)
+def _bracket_index(notional_value: float) -> int:
+    """純量名義價值 → 級別索引（重複查詢直接命中 lru_cache）"""
+    idx = bisect_right(_BRACKET_CAPS_LIST, notional_value)
+    return idx if idx < len(_BRACKETS) else len(_BRACKETS) - 1
+
+
+# 顯式簽名 + cache：import 時即編譯、編譯產物落盤，重跑不再付 JIT 成本
+@njit("float64(float64, float64, float64, float64, boolean)", cache=True, fastmath=True)
+def _liquidation_price(wallet_balance: float, mma: float, position_size: float,
+                       mmr: float, is_long: bool) -> float:
+    """幣安爆倉價格純量核心（多單分母 mmr-1、空單 mmr+1，負值夾為 0）"""
+    if is_long:
+        price = (wallet_balance - mma) / (position_size * (mmr - 1.0))
+    else:
+        price = (wallet_balance - mma) / (position_size * (mmr + 1.0))
+    return price if price > 0.0 else 0.0
 
 
 class LeverageCalculator:
@@ -21,12 +67,29 @@ class LeverageCalculator:
         Returns:
             對應的槓桿級別字典
         """
-        for bracket in config.BINANCE_LEVERAGE_BRACKETS:
-            if bracket["notional_min"] <= notional_value < bracket["notional_max"]:
-                return bracket
-        
-        # 如果超過最大範圍，使用最後一個級別
-        return config.BINANCE_LEVERAGE_BRACKETS[-1]
+        # float() 正規化 int/float 鍵值，讓 lru_cache 的命中率最大化
+        return _BRACKETS[_bracket_index(float(notional_value))]
+
+    @staticmethod
+    def get_leverage_brackets_vec(notional_values) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        批次查表：一次取得多個名義價值對應的級別欄位
+
+        Args:
+            notional_values: 名義持倉價值陣列（或可轉陣列的序列）
+
+        Returns:
+            (max_leverage, maintenance_margin_rate, maintenance_amount) 三個陣列
+        """
+        notionals = np.asarray(notional_values, dtype=np.float64)
+        # 級別只有十餘級：廣播比較 + 計數（無分支 SIMD）比 searchsorted 的
+        # 二分分支更快，比較矩陣小到整個留在 L1；語意同 side='right'
+        # （notional 等於上限時落入下一級），超出最後一級則夾回最後一級
+        idx = np.minimum(
+            np.count_nonzero(notionals[..., None] >= _BRACKET_CAPS, axis=-1),
+            len(_BRACKET_CAPS) - 1
+        )
+        return _BRACKET_MAX_LEV[idx], _BRACKET_MMR[idx], _BRACKET_MAINT[idx]
     
     @staticmethod
     def calculate_max_leverage(notional_value: float) -> int:
@@ -118,9 +181,55 @@ class LeverageCalculator:
             "position_quantity": position_quantity,
             "maintenance_margin_rate": bracket["maintenance_margin_rate"],
             "maintenance_margin": maintenance_margin,
+            "maintenance_amount": bracket["maintenance_amount"],
             "leverage_bracket": bracket,
             "leverage_limited": actual_leverage < desired_leverage
         }
+
+    @staticmethod
+    def calculate_position_details_vec(capital, position_size_ratio: float,
+                                       desired_leverage: int, entry_prices) -> Dict:
+        """
+        批次計算持倉詳情（capital / entry_prices 可為陣列）
+
+        與 calculate_position_details 相同的計算流程，改以 ufunc
+        一次算完所有情境，回傳「欄位 → 陣列」的字典；
+        級別查表走 get_leverage_brackets_vec 的二分批次路徑。
+
+        Args:
+            capital: 可用資金（純量或陣列）
+            position_size_ratio: 倉位大小比率
+            desired_leverage: 期望槓桿倍數
+            entry_prices: 進場價格（純量或陣列）
+
+        Returns:
+            持倉詳情字典，各欄位為與輸入廣播後同形狀的陣列
+        """
+        capital, entry_prices = np.broadcast_arrays(
+            np.asarray(capital, dtype=np.float64),
+            np.asarray(entry_prices, dtype=np.float64)
+        )
+
+        margin_used = capital * position_size_ratio
+        initial_notional = margin_used * desired_leverage
+        max_lev, _, _ = LeverageCalculator.get_leverage_brackets_vec(initial_notional)
+        actual_leverage = np.minimum(desired_leverage, max_lev)
+        actual_notional = margin_used * actual_leverage
+        position_quantity = actual_notional / entry_prices
+        _, mmr, maint_amount = LeverageCalculator.get_leverage_brackets_vec(actual_notional)
+        maintenance_margin = actual_notional * mmr - maint_amount
+
+        return {
+            "margin_used": margin_used,
+            "actual_leverage": actual_leverage,
+            "desired_leverage": desired_leverage,
+            "actual_notional": actual_notional,
+            "position_quantity": position_quantity,
+            "maintenance_margin_rate": mmr,
+            "maintenance_margin": maintenance_margin,
+            "maintenance_amount": maint_amount,
+            "leverage_limited": actual_leverage < desired_leverage
+        }
     
     @staticmethod
     def calculate_liquidation_price(entry_price: float, position_details: Dict, 
@@ -139,7 +248,9 @@ class LeverageCalculator:
         notional = position_details["actual_notional"]
         margin = position_details["margin_used"]
         mmr = position_details["maintenance_margin_rate"]
-        mma = position_details["leverage_bracket"]["maintenance_amount"]
+        mma = position_details.get("maintenance_amount")
+        if mma is None:
+            mma = position_details["leverage_bracket"]["maintenance_amount"]
         
         # 幣安爆倉價格公式
         # 多單爆倉價格 = (WB - MMA) / (PS × (MMR - 1))
@@ -148,16 +259,37 @@ class LeverageCalculator:
         
         position_size = position_details["position_quantity"]
         wallet_balance = margin  # 簡化：假設錢包餘額等於保證金
-        
-        if is_long:
-            # 做多爆倉價格
-            liquidation_price = (wallet_balance - mma) / (position_size * (mmr - 1))
-        else:
-            # 做空爆倉價格  
-            liquidation_price = (wallet_balance - mma) / (position_size * (mmr + 1))
-        
-        return max(0, liquidation_price)  # 確保價格不為負數
+
+        return _liquidation_price(
+            float(wallet_balance), float(mma), float(position_size),
+            float(mmr), bool(is_long)
+        )
     
+    @staticmethod
+    def calculate_liquidation_prices(position_details: Dict) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        批次計算多空兩方向的爆倉價格
+
+        與 calculate_liquidation_price 同一公式；(WB - MMA) / PS
+        這個中間項兩個方向共用、只算一次，再各除以方向分母。
+        欄位可為 calculate_position_details_vec 回傳的陣列或純量。
+
+        Args:
+            position_details: 持倉詳情（欄位 → 陣列或純量）
+
+        Returns:
+            (做多爆倉價, 做空爆倉價) 兩個陣列
+        """
+        margin = np.asarray(position_details["margin_used"], dtype=np.float64)
+        mmr = np.asarray(position_details["maintenance_margin_rate"], dtype=np.float64)
+        mma = np.asarray(position_details["maintenance_amount"], dtype=np.float64)
+        quantity = np.asarray(position_details["position_quantity"], dtype=np.float64)
+
+        base = (margin - mma) / quantity  # 兩方向共用的中間項
+        liq_long = np.maximum(0.0, base / (mmr - 1.0))
+        liq_short = np.maximum(0.0, base / (mmr + 1.0))
+        return liq_long, liq_short
+
     @staticmethod
     def get_leverage_info_summary(notional_value: float) -> str:
         """
@@ -11,6 +11,17 @@ import warnings
 import requests
 import time
 
+# K 線回應是上千列的巨型 JSON 陣列，orjson 解析快 3-5 倍；
+# 未安裝時退回標準庫 json，行為不變
+try:
+    import orjson as _json
+
+    def _parse_json(response: requests.Response):
+        return _json.loads(response.content)
+except ImportError:
+    def _parse_json(response: requests.Response):
+        return response.json()
+
 from ..core import config
 
 # 設定台灣時區 (UTC+8)
@@ -43,30 +54,34 @@ class BinanceDataProvider:
         """初始化數據提供者"""
         self.base_url = "https://api.binance.com"
         self.name = "Binance"
-        
-    def get_ohlcv_data(self, symbol: str, interval: str, n_bars: int = 1000) -> Optional[pd.DataFrame]:
+        # 使用 keep-alive Session 重用連線，避免每次請求重新建立 TCP/TLS
+        self.session = requests.Session()
+
+    def get_ohlcv_data(self, symbol: str, interval: str, n_bars: int = 1000,
+                       since: Optional[int] = None) -> Optional[pd.DataFrame]:
         """
         獲取 OHLCV 數據
-        
+
         Args:
             symbol: 交易對符號 (如 'SOLUSDT')
             interval: 時間間隔 ('1h', '4h', '1d' 等)
             n_bars: 獲取的K線數量 (最大1000)
-        
+            since: 起始時間戳（毫秒，None 表示取最新的 n_bars 根）
+
         Returns:
             包含 OHLCV 數據的 DataFrame，索引為時間戳
         """
-        
+
         try:
             # 檢查時間間隔
             if interval not in BINANCE_INTERVALS:
                 print(f"❌ 不支援的時間間隔: {interval}")
                 print(f"支援的時間間隔: {list(BINANCE_INTERVALS.keys())}")
                 return None
-            
+
             # 限制數據量
             limit = min(n_bars, 1000)  # Binance API 限制
-            
+
             # 建立 API 請求
             endpoint = "/api/v3/klines"
             params = {
@@ -74,17 +89,19 @@ class BinanceDataProvider:
                 'interval': BINANCE_INTERVALS[interval],
                 'limit': limit
             }
-            
+            if since is not None:
+                params['startTime'] = int(since)
+
             # 發送請求
             url = self.base_url + endpoint
-            response = requests.get(url, params=params, timeout=30)
-            
+            response = self.session.get(url, params=params, timeout=30)
+
             if response.status_code != 200:
                 print(f"❌ Binance API 請求失敗: {response.status_code}")
                 return None
-            
-            data = response.json()
-            
+
+            data = _parse_json(response)
+
             if not data:
                 print(f"❌ 沒有獲取到 {symbol} 的數據")
                 return None
@@ -123,6 +140,61 @@ class BinanceDataProvider:
             print(f"❌ 獲取數據時發生錯誤: {e}")
             return None
 
+    def get_ohlcv_arrays(self, symbol: str, interval: str, n_bars: int = 1000) -> Optional[Dict[str, np.ndarray]]:
+        """
+        獲取 OHLCV 數據（numpy 陣列版，跳過 DataFrame 建構）
+
+        針對監控熱路徑設計：API 回傳的 K 線列表直接轉成欄狀 (SoA) numpy 陣列，
+        省去 DataFrame 往返的開銷。
+
+        Args:
+            symbol: 交易對符號 (如 'SOLUSDT')
+            interval: 時間間隔 ('1h', '4h', '1d' 等)
+            n_bars: 獲取的K線數量 (最大1000)
+
+        Returns:
+            {'timestamp', 'open', 'high', 'low', 'close', 'volume'} 的 numpy 陣列字典，
+            timestamp 為毫秒 int64，其餘為 float64
+        """
+        try:
+            if interval not in BINANCE_INTERVALS:
+                print(f"❌ 不支援的時間間隔: {interval}")
+                return None
+
+            limit = min(n_bars, 1000)  # Binance API 限制
+
+            url = self.base_url + "/api/v3/klines"
+            params = {
+                'symbol': symbol.upper(),
+                'interval': BINANCE_INTERVALS[interval],
+                'limit': limit
+            }
+            response = self.session.get(url, params=params, timeout=30)
+
+            if response.status_code != 200:
+                print(f"❌ Binance API 請求失敗: {response.status_code}")
+                return None
+
+            data = _parse_json(response)
+            if not data:
+                print(f"❌ 沒有獲取到 {symbol} 的數據")
+                return None
+
+            # 直接建構欄狀陣列（前 6 欄：timestamp, open, high, low, close, volume）
+            raw = np.array([row[:6] for row in data], dtype=np.float64)
+            return {
+                'timestamp': raw[:, 0].astype(np.int64),
+                'open': raw[:, 1],
+                'high': raw[:, 2],
+                'low': raw[:, 3],
+                'close': raw[:, 4],
+                'volume': raw[:, 5]
+            }
+
+        except Exception as e:
+            print(f"❌ 獲取數據時發生錯誤: {e}")
+            return None
+
 
 # 全域數據提供者實例
 _data_provider = BinanceDataProvider()
@@ -190,7 +262,7 @@ def get_binance_klines(symbol: str, interval: str, start_date: str, end_date: st
                     print(f"❌ Binance API 請求失敗: {response.status_code}")
                     break
                 
-                data = response.json()
+                data = _parse_json(response)
                 
                 if not data:
                     print(f"⚠️  沒有更多數據可獲取")
@@ -272,9 +344,10 @@ class DataProvider:
         self.provider = _data_provider
         self.exchange = exchange or "binance"
     
-    def get_ohlcv_data(self, symbol: str, interval: str, n_bars: int = 1000) -> Optional[pd.DataFrame]:
+    def get_ohlcv_data(self, symbol: str, interval: str, n_bars: int = 1000,
+                       since: Optional[int] = None) -> Optional[pd.DataFrame]:
         """獲取 OHLCV 數據"""
-        return self.provider.get_ohlcv_data(symbol, interval, n_bars)
+        return self.provider.get_ohlcv_data(symbol, interval, n_bars, since=since)
     
     def get_current_price(self, symbol: str) -> Optional[float]:
         """
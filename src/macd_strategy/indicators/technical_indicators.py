@@ -5,32 +5,127 @@
 
 import pandas as pd
 import numpy as np
-import ta
 from typing import Tuple, Optional
 import logging
 from ..core import config
+from ..core.jit import njit
 from pathlib import Path
 
 # 設定日誌
 logger = logging.getLogger(__name__)
 
+# calculate_indicators_lite 輸出的列索引（SoA 佈局）
+LITE_CLOSE = 0
+LITE_MACD = 1
+LITE_SIGNAL = 2
+LITE_HIST = 3
+LITE_ATR = 4
+
+
+# 顯式簽名（float32/float64 雙版本）讓編譯發生在 import 時而非首次整點檢查，
+# 搭配 cache=True 之後的行程直接載入磁碟上的編譯產物
+@njit(["float64[::1](float64[::1], int64)",
+       "float32[::1](float32[::1], int64)"], cache=True)
+def _ema(values: np.ndarray, period: int) -> np.ndarray:
+    """遞迴式指數移動平均（等同 ewm(span=period, adjust=False)）"""
+    out = np.empty_like(values)
+    alpha = 2.0 / (period + 1.0)
+    out[0] = values[0]
+    for i in range(1, len(values)):
+        out[i] = alpha * values[i] + (1.0 - alpha) * out[i - 1]
+    return out
+
+
+@njit(["float64[::1](float64[::1], float64[::1], float64[::1], int64)",
+       "float32[::1](float32[::1], float32[::1], float32[::1], int64)"],
+      cache=True, fastmath=True)
+def _atr_loop(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+              period: int) -> np.ndarray:
+    """真實波幅 + Wilder 平滑的 ATR 遞迴迴圈"""
+    n = len(close)
+    tr = np.empty_like(close)
+    tr[0] = high[0] - low[0]
+    for i in range(1, n):
+        hl = high[i] - low[i]
+        hc = abs(high[i] - close[i - 1])
+        lc = abs(low[i] - close[i - 1])
+        tr[i] = max(hl, max(hc, lc))
+
+    atr = np.empty_like(close)
+    atr[0] = tr[0]
+    alpha = 1.0 / period
+    for i in range(1, n):
+        atr[i] = alpha * tr[i] + (1.0 - alpha) * atr[i - 1]
+    return atr
+
+
+@njit(["float64[:, ::1](float64[::1], float64[::1], float64[::1], int64, int64, int64, int64)",
+       "float32[:, ::1](float32[::1], float32[::1], float32[::1], int64, int64, int64, int64)"],
+      cache=True)
+def _indicators_kernel(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                       fast: int, slow: int, signal: int, atr_period: int) -> np.ndarray:
+    """MACD + ATR 的 numpy 計算核心，返回 shape (5, N) 的 SoA 陣列（dtype 跟隨輸入）"""
+    n = len(close)
+    out = np.empty((5, n), close.dtype)
+    out[LITE_CLOSE] = close
+
+    # MACD
+    macd = _ema(close, fast) - _ema(close, slow)
+    macd_signal = _ema(macd, signal)
+    out[LITE_MACD] = macd
+    out[LITE_SIGNAL] = macd_signal
+    out[LITE_HIST] = macd - macd_signal
+
+    out[LITE_ATR] = _atr_loop(high, low, close, atr_period)
+
+    return out
+
+@njit("int8[::1](float64[::1], float64[::1], int64)", cache=True)
+def _signal_series_kernel(hist_1h: np.ndarray, hist_4h: np.ndarray,
+                          min_bars: int) -> np.ndarray:
+    """整段序列的零軸穿越信號偵測（連續同號計數以純量狀態跨迭代攜帶）"""
+    n = len(hist_1h)
+    out = np.zeros(n, dtype=np.int8)
+    neg_run = 0
+    pos_run = 0
+    for i in range(n):
+        if i > 0:
+            h = hist_1h[i]
+            h_prev = hist_1h[i - 1]
+            if h > 0.0 and h_prev <= 0.0 and neg_run >= min_bars and hist_4h[i] > 0.0:
+                out[i] = 1
+            elif h < 0.0 and h_prev >= 0.0 and pos_run >= min_bars and hist_4h[i] < 0.0:
+                out[i] = -1
+        if hist_1h[i] < 0.0:
+            neg_run += 1
+        else:
+            neg_run = 0
+        if hist_1h[i] > 0.0:
+            pos_run += 1
+        else:
+            pos_run = 0
+    return out
+
+
 class TechnicalIndicators:
     """技術指標計算器"""
     
     @staticmethod
-    def calculate_macd(data: pd.DataFrame, 
-                      fast: int = None, 
-                      slow: int = None, 
-                      signal: int = None) -> pd.DataFrame:
+    def calculate_macd(data: pd.DataFrame,
+                      fast: int = None,
+                      slow: int = None,
+                      signal: int = None,
+                      copy: bool = True) -> pd.DataFrame:
         """
         計算 MACD 指標
-        
+
         Args:
             data: 包含 close 價格的 DataFrame
             fast: 快線週期 (None時使用config預設值)
             slow: 慢線週期 (None時使用config預設值)
             signal: 信號線週期 (None時使用config預設值)
-            
+            copy: 是否先複製輸入（呼叫端已持有私有副本時可傳 False 省一次複製）
+
         Returns:
             包含 MACD 指標的 DataFrame
         """
@@ -42,15 +137,18 @@ class TechnicalIndicators:
                 slow = config.MACD_SLOW
             if signal is None:
                 signal = config.MACD_SIGNAL
-                
-            df = data.copy()
-            
-            # 計算 MACD
-            macd_line = ta.trend.MACD(close=df['close'], window_fast=fast, window_slow=slow, window_sign=signal)
-            
-            df['macd'] = macd_line.macd()
-            df['macd_signal'] = macd_line.macd_signal()
-            df['macd_histogram'] = macd_line.macd_diff()
+
+            df = data.copy() if copy else data
+
+            # 計算 MACD（JIT 遞迴核心，傳入 numpy 陣列避開 pandas 逐元素開銷）
+            # 指標以 float32 計算（記憶體流量減半），價格欄位保持 float64
+            close = np.ascontiguousarray(df['close'].to_numpy(), dtype=np.float32)
+            macd = _ema(close, fast) - _ema(close, slow)
+            macd_signal = _ema(macd, signal)
+
+            df['macd'] = macd.astype(np.float64)
+            df['macd_signal'] = macd_signal.astype(np.float64)
+            df['macd_histogram'] = (macd - macd_signal).astype(np.float64)
             
             logger.debug(f"成功計算 MACD 指標，參數: fast={fast}, slow={slow}, signal={signal}")
             return df
@@ -60,14 +158,16 @@ class TechnicalIndicators:
             return data
     
     @staticmethod
-    def calculate_atr(data: pd.DataFrame, period: int = None) -> pd.DataFrame:
+    def calculate_atr(data: pd.DataFrame, period: int = None,
+                      copy: bool = True) -> pd.DataFrame:
         """
         計算 ATR (Average True Range) 指標
-        
+
         Args:
             data: 包含 high, low, close 價格的 DataFrame
             period: ATR 計算週期 (None時使用config預設值)
-            
+            copy: 是否先複製輸入（呼叫端已持有私有副本時可傳 False 省一次複製）
+
         Returns:
             包含 ATR 指標的 DataFrame
         """
@@ -75,16 +175,16 @@ class TechnicalIndicators:
             # 使用config預設值
             if period is None:
                 period = config.ATR_PERIOD
-                
-            df = data.copy()
-            
-            # 計算 ATR
-            df['atr'] = ta.volatility.AverageTrueRange(
-                high=df['high'],
-                low=df['low'],
-                close=df['close'],
-                window=period
-            ).average_true_range()
+
+            df = data.copy() if copy else data
+
+            # 計算 ATR（JIT 遞迴核心，float32 計算後轉回 float64 欄位）
+            df['atr'] = _atr_loop(
+                np.ascontiguousarray(df['high'].to_numpy(), dtype=np.float32),
+                np.ascontiguousarray(df['low'].to_numpy(), dtype=np.float32),
+                np.ascontiguousarray(df['close'].to_numpy(), dtype=np.float32),
+                period
+            ).astype(np.float64)
             
             logger.debug(f"成功計算 ATR 指標，週期: {period}")
             return df
@@ -93,6 +193,52 @@ class TechnicalIndicators:
             logger.error(f"計算 ATR 指標失敗: {e}")
             return data
     
+    @staticmethod
+    def calculate_indicators_lite(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                                  fast: int = None, slow: int = None, signal: int = None,
+                                  atr_period: int = None) -> Optional[np.ndarray]:
+        """
+        計算 MACD 與 ATR（輕量版，純 numpy，不經過 DataFrame）
+
+        監控模式只需讀取最後幾根的純量值，DataFrame 往返是多餘的；
+        本方法直接在欄狀陣列上計算，搭配 BinanceDataProvider.get_ohlcv_arrays 使用。
+
+        Args:
+            high: 最高價陣列
+            low: 最低價陣列
+            close: 收盤價陣列
+            fast: 快線週期 (None時使用config預設值)
+            slow: 慢線週期 (None時使用config預設值)
+            signal: 信號線週期 (None時使用config預設值)
+            atr_period: ATR 計算週期 (None時使用config預設值)
+
+        Returns:
+            shape (5, N) 的陣列，列依序為 close / macd / macd_signal /
+            macd_histogram / atr（索引見 LITE_* 常數）
+        """
+        try:
+            # 使用config預設值
+            if fast is None:
+                fast = config.MACD_FAST
+            if slow is None:
+                slow = config.MACD_SLOW
+            if signal is None:
+                signal = config.MACD_SIGNAL
+            if atr_period is None:
+                atr_period = config.ATR_PERIOD
+
+            # float32 計算：指標精度綽綽有餘，記憶體流量減半
+            return _indicators_kernel(
+                np.ascontiguousarray(high, dtype=np.float32),
+                np.ascontiguousarray(low, dtype=np.float32),
+                np.ascontiguousarray(close, dtype=np.float32),
+                fast, slow, signal, atr_period
+            )
+
+        except Exception as e:
+            logger.error(f"計算輕量版指標失敗: {e}")
+            return None
+
     @staticmethod
     def check_macd_turn_positive(macd_hist: pd.Series, min_consecutive: int = None) -> bool:
         """
@@ -254,6 +400,27 @@ class SignalAnalyzer:
             min_consecutive_bars = config.MIN_CONSECUTIVE_BARS
         self.min_consecutive_bars = min_consecutive_bars
     
+    def analyze_signal_series(self, hist_1h: np.ndarray, hist_4h: np.ndarray) -> np.ndarray:
+        """
+        批次計算整段直方圖序列的進場信號
+
+        與 analyze_long_signal/analyze_short_signal 的逐根語義一致
+        （零軸穿越 + 前段連續 >= N 根同號 + 4H 同向確認），但整段
+        序列在單一 JIT 迴圈內算完，回測驅動不必逐根呼叫分析器。
+
+        Args:
+            hist_1h: 1小時 MACD 直方圖陣列（NaN 需先轉 0）
+            hist_4h: 已對齊到 1H 索引的 4小時 MACD 直方圖陣列
+
+        Returns:
+            int8 陣列：1 做多信號、-1 做空信號、0 無信號
+        """
+        return _signal_series_kernel(
+            np.ascontiguousarray(hist_1h, dtype=np.float64),
+            np.ascontiguousarray(hist_4h, dtype=np.float64),
+            self.min_consecutive_bars
+        )
+
     def analyze_long_signal(self, data_4h: pd.DataFrame, data_1h: pd.DataFrame) -> dict:
         """
         分析做多信號
@@ -0,0 +1,150 @@
+"""
+回測核心迴圈（Numba JIT）
+以 SoA numpy 陣列逐根 K 線跑持倉狀態機，供 MacdTradingStrategy.backtest 使用
+"""
+
+import numpy as np
+
+from ..core.jit import njit
+
+# 交易記錄欄位索引（_run_backtest 回傳的 (M, 6) 陣列）
+TRADE_ENTRY_IDX = 0
+TRADE_EXIT_IDX = 1
+TRADE_SIDE = 2      # 1 = long, -1 = short
+TRADE_ENTRY_PX = 3
+TRADE_EXIT_PX = 4
+TRADE_PNL = 5
+
+
+# 顯式簽名讓編譯發生在 import 時而非首次呼叫，搭配 cache=True
+# 後續執行直接載入磁碟上的編譯產物，省去每次啟動的 JIT 延遲
+_BACKTEST_SIGNATURE = (
+    "float64[:, ::1](float64[::1], float64[::1], float64[::1], float64[::1], "
+    "float64[::1], float64[::1], float64[::1], int64, float64, float64, float64)"
+)
+
+
+@njit(_BACKTEST_SIGNATURE, cache=True, fastmath=True)
+def _run_backtest(open_: np.ndarray, high: np.ndarray, low: np.ndarray,
+                  close: np.ndarray, hist_1h: np.ndarray, hist_4h: np.ndarray,
+                  atr: np.ndarray, min_bars: int, sl_mult: float, tp_mult: float,
+                  position_size: float) -> np.ndarray:
+    """
+    逐根 K 線模擬持倉狀態機
+
+    信號偵測（零軸穿越 + 前段連續根數 + 4H 同向確認）與持倉會計
+    都在同一個純量迴圈內完成，不經過 numpy 布林遮罩的中間陣列。
+    信號根收盤確認後於下一根開盤進場，停損/停利以最高/最低價觸發，
+    結束時若仍有持倉則以最後收盤價強制平倉。
+
+    Args:
+        open_/high/low/close: OHLC 價格陣列 (float64)
+        hist_1h: 1小時 MACD 直方圖（已對齊，NaN 需先轉 0）
+        hist_4h: 4小時 MACD 直方圖（已對齊到每根 1H K 線）
+        atr: ATR 陣列（進場時取信號根的值計算停損停利）
+        min_bars: 穿越前最少連續同號根數
+        sl_mult: 停損距離倍數
+        tp_mult: 停利距離倍數（已含風報比）
+        position_size: 每筆倉位大小
+
+    Returns:
+        shape (M, 6) 的交易記錄陣列，欄位見 TRADE_* 常數
+    """
+    n = close.shape[0]
+    # 每根最多產生一筆交易（min_bars<=1 且同根觸發出場時可逼近此上限），
+    # njit 不做邊界檢查，緩衝區必須取保守上界避免越界寫入
+    trades = np.empty((n + 2, 6))
+    count = 0
+
+    in_pos = 0        # 0 = 無持倉, 1 = 多單, -1 = 空單
+    pending = 0       # 待進場方向（下一根開盤執行）
+    pending_atr = 0.0
+    entry_i = -1
+    entry_px = 0.0
+    sl = 0.0
+    tp = 0.0
+
+    # 截至前一根為止的連續負值/正值根數（跨迭代攜帶的純量狀態）
+    neg_run = 0
+    pos_run = 0
+
+    for i in range(n):
+        # 處理待進場信號（新 K 線開盤進場）
+        if in_pos == 0 and pending != 0:
+            in_pos = pending
+            entry_i = i
+            entry_px = open_[i]
+            sl_dist = pending_atr * sl_mult
+            tp_dist = pending_atr * tp_mult
+            if in_pos == 1:
+                sl = entry_px - sl_dist
+                tp = entry_px + tp_dist
+            else:
+                sl = entry_px + sl_dist
+                tp = entry_px - tp_dist
+            pending = 0
+
+        # 檢查停損停利（最低價檢查一側、最高價檢查另一側）
+        if in_pos != 0:
+            exit_px = 0.0
+            hit = False
+            if in_pos == 1:
+                if low[i] <= sl:
+                    exit_px = sl
+                    hit = True
+                elif high[i] >= tp:
+                    exit_px = tp
+                    hit = True
+            else:
+                if high[i] >= sl:
+                    exit_px = sl
+                    hit = True
+                elif low[i] <= tp:
+                    exit_px = tp
+                    hit = True
+
+            if hit:
+                pnl = (exit_px - entry_px) * position_size * in_pos
+                trades[count, TRADE_ENTRY_IDX] = entry_i
+                trades[count, TRADE_EXIT_IDX] = i
+                trades[count, TRADE_SIDE] = in_pos
+                trades[count, TRADE_ENTRY_PX] = entry_px
+                trades[count, TRADE_EXIT_PX] = exit_px
+                trades[count, TRADE_PNL] = pnl
+                count += 1
+                in_pos = 0
+
+        # 檢查進場信號（無持倉且無待進場時）
+        if in_pos == 0 and pending == 0 and i > 0:
+            h = hist_1h[i]
+            h_prev = hist_1h[i - 1]
+            if h > 0.0 and h_prev <= 0.0 and neg_run >= min_bars and hist_4h[i] > 0.0:
+                pending = 1
+                pending_atr = atr[i]
+            elif h < 0.0 and h_prev >= 0.0 and pos_run >= min_bars and hist_4h[i] < 0.0:
+                pending = -1
+                pending_atr = atr[i]
+
+        # 更新連續同號計數（供下一根的信號判斷使用）
+        if hist_1h[i] < 0.0:
+            neg_run += 1
+        else:
+            neg_run = 0
+        if hist_1h[i] > 0.0:
+            pos_run += 1
+        else:
+            pos_run = 0
+
+    # 結束時強制平倉
+    if in_pos != 0:
+        exit_px = close[n - 1]
+        pnl = (exit_px - entry_px) * position_size * in_pos
+        trades[count, TRADE_ENTRY_IDX] = entry_i
+        trades[count, TRADE_EXIT_IDX] = n - 1
+        trades[count, TRADE_SIDE] = in_pos
+        trades[count, TRADE_ENTRY_PX] = entry_px
+        trades[count, TRADE_EXIT_PX] = exit_px
+        trades[count, TRADE_PNL] = pnl
+        count += 1
+
+    return trades[:count]
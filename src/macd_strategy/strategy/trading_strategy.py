@@ -3,18 +3,26 @@ MACD 短線交易策略主程式
 整合數據獲取、指標計算、信號分析和交易執行
 """
 
+import argparse
 import pandas as pd
 import numpy as np
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Optional, List
+from typing import ClassVar, Dict, Optional, List
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+import random
 import time
 import os
+import sys
 
 from ..core import config
+from ..core.jit import njit
 from ..data.data_provider import DataProvider
 from ..indicators.technical_indicators import TechnicalIndicators, SignalAnalyzer
 from ..trading.trade_executor import TradeExecutor
+from ._backtest_loop import (_run_backtest, TRADE_ENTRY_IDX, TRADE_EXIT_IDX,
+                             TRADE_SIDE, TRADE_ENTRY_PX, TRADE_EXIT_PX, TRADE_PNL)
 
 # 設定日誌
 logging.basicConfig(
@@ -24,6 +32,53 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# 已平倉交易的 SoA 儲存格式（結構化陣列，欄狀存取供統計聚合）
+_POS_DTYPE = np.dtype([
+    ('side', 'i1'),             # 1 = long, -1 = short
+    ('entry_price', 'f8'),
+    ('exit_price', 'f8'),
+    ('size', 'f8'),
+    ('stop_loss', 'f8'),
+    ('take_profit', 'f8'),
+    ('entry_time', 'datetime64[ns]'),
+    ('exit_time', 'datetime64[ns]'),
+    ('pnl', 'f8'),
+])
+
+
+# 信號條件名稱 → 中文描述（模組層級字典，診斷日誌 O(1) 查表）
+_LONG_COND_DESC = {
+    'step1_first_positive': '1H MACD剛轉正',
+    'step2_enough_negative': '前段負值足夠',
+    'step3_4h_positive': '4H MACD為正',
+}
+_SHORT_COND_DESC = {
+    'step1_first_negative': '1H MACD剛轉負',
+    'step2_enough_positive': '前段正值足夠',
+    'step3_4h_negative': '4H MACD為負',
+}
+
+
+# 顯式簽名：import 時即編譯，首次整點檢查不再付 JIT 延遲
+@njit("int64(float64, float64, float64)", cache=True, fastmath=True)
+def _macd_signal(h1_prev: float, h1_curr: float, h4_curr: float) -> int:
+    """
+    MACD 零軸穿越純量核心（熱路徑快速預判用）
+
+    Args:
+        h1_prev: 前一根 1 小時 MACD 直方圖
+        h1_curr: 當前 1 小時 MACD 直方圖
+        h4_curr: 當前 4 小時 MACD 直方圖
+
+    Returns:
+        1 (做多方向), -1 (做空方向), 0 (無穿越)
+    """
+    if h1_prev <= 0.0 and h1_curr > 0.0 and h4_curr > 0.0:
+        return 1   # 轉正且 4H 確認
+    if h1_prev >= 0.0 and h1_curr < 0.0 and h4_curr < 0.0:
+        return -1  # 轉負且 4H 確認
+    return 0
+
 
 class Position:
     """持倉資訊"""
@@ -109,20 +164,99 @@ class Position:
         }
 
 
+class PositionBook:
+    """
+    持倉簿（SoA 平行陣列）
+
+    即時交易一次只持有一個倉位，走 Position.check_stop_conditions 的
+    純量判斷即可；本類別針對需要同時追蹤大量持倉的批次情境
+    （回測分析、多策略聚合），以 numpy 遮罩一次算完所有持倉的
+    觸發狀態，省去逐倉的 Python 分派與方向分支。
+    """
+
+    def __init__(self, capacity: int = 16):
+        self._n = 0
+        self.entry_price = np.empty(capacity)
+        self.size = np.empty(capacity)
+        self.stop_loss = np.empty(capacity)
+        self.take_profit = np.empty(capacity)
+        self.side_sign = np.empty(capacity)  # +1 = long, -1 = short
+
+    def __len__(self) -> int:
+        return self._n
+
+    def add(self, side: str, entry_price: float, size: float,
+            stop_loss: float, take_profit: float) -> int:
+        """加入持倉，回傳其索引"""
+        if self._n == len(self.entry_price):
+            new_cap = self._n * 2
+            self.entry_price = np.resize(self.entry_price, new_cap)
+            self.size = np.resize(self.size, new_cap)
+            self.stop_loss = np.resize(self.stop_loss, new_cap)
+            self.take_profit = np.resize(self.take_profit, new_cap)
+            self.side_sign = np.resize(self.side_sign, new_cap)
+
+        i = self._n
+        self.entry_price[i] = entry_price
+        self.size[i] = size
+        self.stop_loss[i] = stop_loss
+        self.take_profit[i] = take_profit
+        self.side_sign[i] = 1.0 if side == 'long' else -1.0
+        self._n += 1
+        return i
+
+    def check_stop_conditions(self, current_price: float):
+        """
+        批次檢查停損停利觸發
+
+        多空共用同一條判斷式：side_sign*(price - stop_loss) <= 0 觸發停損、
+        side_sign*(take_profit - price) <= 0 觸發停利，無方向分支。
+        停損優先，與 Position.check_stop_conditions 的判斷順序一致。
+
+        Args:
+            current_price: 當前價格
+
+        Returns:
+            (hit_sl, hit_tp) 兩個布林遮罩，長度為持倉數
+        """
+        n = self._n
+        side = self.side_sign[:n]
+        hit_sl = side * (current_price - self.stop_loss[:n]) <= 0.0
+        hit_tp = (side * (self.take_profit[:n] - current_price) <= 0.0) & ~hit_sl
+        return hit_sl, hit_tp
+
+
 class MacdTradingStrategy:
     """MACD 短線交易策略"""
-    
-    def __init__(self):
+
+    # 監控日誌 handler（類別層級共享：重複實例化時重用同一組 handler，
+    # 不會每個實例各開一個時間戳日誌檔而洩漏檔案描述符）
+    _file_handler: ClassVar[Optional[logging.FileHandler]] = None
+    _console_handler: ClassVar[Optional[logging.StreamHandler]] = None
+
+    def __init__(self, symbol: str = None):
         """
         初始化交易策略
+
+        Args:
+            symbol: 交易對符號（None 時使用 config.SYMBOL；
+                    組合監控時可為每個實例指定不同交易對）
         """
-        self.symbol = config.SYMBOL
+        self.symbol = symbol or config.SYMBOL
         self.data_provider = DataProvider(config.EXCHANGE)
         self.signal_analyzer = SignalAnalyzer(config.MIN_CONSECUTIVE_BARS)
         self.trade_executor = TradeExecutor()  # 添加交易執行器
+
+        # 預先計算停損/停利倍數與倉位大小，避免熱路徑上重複的 config 屬性查找
+        self._sl_mult = float(config.STOP_LOSS_MULTIPLIER)
+        self._tp_mult = float(config.STOP_LOSS_MULTIPLIER * config.RISK_REWARD_RATIO)
+        self._position_size = float(config.POSITION_SIZE)
         
-        # 交易狀態
-        self.positions: List[Position] = []
+        # 交易狀態（已平倉交易存 SoA 結構化陣列，容量翻倍成長、有上限）
+        # 達到上限後丟棄最舊的一半，無限監控模式下記憶體維持有界
+        self._pos_arr = np.empty(16, dtype=_POS_DTYPE)
+        self._pos_count = 0
+        self._pos_cap = int(getattr(config, 'POSITION_HISTORY_MAX', 1000))
         self.current_position: Optional[Position] = None
         self.total_pnl = 0.0
         self.trade_count = 0
@@ -132,6 +266,25 @@ class MacdTradingStrategy:
         self.data_4h = None
         self.data_1h = None
         self.last_update = None
+
+        # 原始 OHLCV 快取（增量更新用，不含指標欄位）
+        self._raw_4h = None
+        self._raw_1h = None
+
+        # 關鍵欄位的 numpy 視圖快取（熱路徑純量讀取用，每次數據更新重建）
+        self._tail = None
+
+        # 尾端時間戳快取（naive UTC），驗證路徑免去每次的索引查找
+        self._latest_1h_ts = None
+        self._latest_4h_ts = None
+
+        # 即時價格快取（單一檢查 tick 內共用，TTL 以 monotonic 時鐘計）
+        self._price_cache_val = None
+        self._price_cache_ts = 0.0
+
+        # 績效摘要快取（以 trade_count 為鍵，只有平倉才會讓它失效）
+        self._summary_cache = None
+        self._summary_cache_n = -1
         
         # 設定監控模式的日誌文件
         self._setup_monitor_logging()
@@ -139,35 +292,112 @@ class MacdTradingStrategy:
         logger.info(f"MACD 交易策略初始化完成 - 交易對: {self.symbol}")
     
     def _setup_monitor_logging(self):
-        """設定監控模式的日誌文件"""
-        # 確保logs目錄存在
+        """設定監控模式的日誌文件（handler 為類別層級，重複實例化不開新檔）"""
+        cls = MacdTradingStrategy
+        if cls._file_handler is not None:
+            return  # 已設定過，直接重用既有 handler
+
+        # 確保logs目錄存在（單一系統呼叫，避免 exists/makedirs 的 TOCTOU 競態）
         logs_dir = "logs"
-        if not os.path.exists(logs_dir):
-            os.makedirs(logs_dir)
-        
+        os.makedirs(logs_dir, exist_ok=True)
+
         # 生成帶時間戳的日誌文件名
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_filename = f"monitor_{timestamp}.log"
-        log_filepath = os.path.join(logs_dir, log_filename)
-        
-        # 為monitor logger添加文件處理器
+        log_filepath = os.path.join(logs_dir, f"monitor_{datetime.now():%Y%m%d_%H%M%S}.log")
+
         monitor_logger = logging.getLogger(__name__)
-        
-        # 檢查是否已經有文件處理器，避免重複添加
-        has_file_handler = any(isinstance(handler, logging.FileHandler) 
-                              for handler in monitor_logger.handlers)
-        
-        if not has_file_handler:
-            file_handler = logging.FileHandler(log_filepath, encoding='utf-8')
-            file_formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+        file_handler = logging.FileHandler(log_filepath, encoding='utf-8')
+        file_formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+        file_handler.setFormatter(file_formatter)
+        file_handler.setLevel(getattr(logging, config.LOG_LEVEL))
+        monitor_logger.addHandler(file_handler)
+
+        # 控制台 handler：訊息原樣輸出，取代散落的 print() 重複格式化
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(logging.Formatter('%(message)s'))
+        console_handler.setLevel(getattr(logging, config.LOG_LEVEL))
+        monitor_logger.addHandler(console_handler)
+
+        # 已自帶檔案 + 控制台雙 handler，不再轉發 root，避免訊息重複出現
+        monitor_logger.propagate = False
+
+        cls._file_handler = file_handler
+        cls._console_handler = console_handler
+
+        logger.info(f"監控日誌文件已設定: {log_filepath}")
+
+    def close(self):
+        """關閉監控日誌 handler，釋放檔案描述符（下次實例化會重開新檔）"""
+        cls = MacdTradingStrategy
+        monitor_logger = logging.getLogger(__name__)
+        if cls._file_handler is not None:
+            monitor_logger.removeHandler(cls._file_handler)
+            cls._file_handler.close()
+            cls._file_handler = None
+        if cls._console_handler is not None:
+            monitor_logger.removeHandler(cls._console_handler)
+            cls._console_handler.close()
+            cls._console_handler = None
+        monitor_logger.propagate = True
+
+    def _record_trade(self, position: Position):
+        """
+        記錄一筆已平倉交易到 SoA 陣列並更新統計
+
+        Args:
+            position: 已平倉的 Position
+        """
+        if self._pos_count == len(self._pos_arr):
+            if len(self._pos_arr) < self._pos_cap:
+                self._pos_arr = np.resize(
+                    self._pos_arr, min(len(self._pos_arr) * 2, self._pos_cap)
+                )
+            else:
+                # 歷史已達上限：就地左移丟棄最舊的一半，只保留近期交易
+                # （total_pnl/trade_count/win_count 是終身計數器，不受影響）
+                half = self._pos_count // 2
+                keep = self._pos_count - half
+                self._pos_arr[:keep] = self._pos_arr[half:self._pos_count]
+                self._pos_count = keep
+
+        row = self._pos_arr[self._pos_count]
+        row['side'] = 1 if position.side == 'long' else -1
+        row['entry_price'] = position.entry_price
+        row['exit_price'] = position.exit_price if position.exit_price is not None else np.nan
+        row['size'] = position.size
+        row['stop_loss'] = position.stop_loss
+        row['take_profit'] = position.take_profit
+        row['entry_time'] = np.datetime64(position.timestamp.replace(tzinfo=None))
+        row['exit_time'] = np.datetime64(position.exit_timestamp.replace(tzinfo=None))
+        row['pnl'] = position.pnl
+        self._pos_count += 1
+
+        self.total_pnl += position.pnl
+        self.trade_count += 1
+        if position.pnl > 0:
+            self.win_count += 1
+
+    @property
+    def positions(self) -> List[Position]:
+        """惰性視圖：從 SoA 陣列重建 Position 物件列表（僅供外部檢視）"""
+        result = []
+        for row in self._pos_arr[:self._pos_count]:
+            position = Position(
+                side='long' if row['side'] > 0 else 'short',
+                entry_price=float(row['entry_price']),
+                size=float(row['size']),
+                stop_loss=float(row['stop_loss']),
+                take_profit=float(row['take_profit']),
+                timestamp=pd.Timestamp(row['entry_time']).to_pydatetime()
             )
-            file_handler.setFormatter(file_formatter)
-            file_handler.setLevel(getattr(logging, config.LOG_LEVEL))
-            monitor_logger.addHandler(file_handler)
-            
-            logger.info(f"監控日誌文件已設定: {log_filepath}")
-    
+            position.close_position(
+                float(row['exit_price']), pd.Timestamp(row['exit_time']).to_pydatetime()
+            )
+            result.append(position)
+        return result
+
     def analyze_signal(self, data_1h: pd.DataFrame, data_4h: pd.DataFrame) -> str:
         """
         分析交易信號（簡化版本，用於回測）
@@ -179,27 +409,114 @@ class MacdTradingStrategy:
         Returns:
             信號 ('BUY', 'SELL', 'HOLD')
         """
-        try:
-            # 檢查數據有效性
-            if data_1h is None or data_4h is None or len(data_1h) < 50 or len(data_4h) < 50:
-                return 'HOLD'
-            
+        # 檢查數據有效性（顯式防衛取代整段 try/except，計算錯誤直接拋出）
+        if data_1h is None or data_4h is None or len(data_1h) < 50 or len(data_4h) < 50:
+            return 'HOLD'
+
+        # 快速預判：無零軸穿越時跳過兩側的完整分析；有穿越時只分析對應方向
+        hist_1h = data_1h['macd_histogram']
+        gate = _macd_signal(
+            float(hist_1h.iat[-2]), float(hist_1h.iat[-1]),
+            float(data_4h['macd_histogram'].iat[-1])
+        )
+        if gate == 0:
+            return 'HOLD'
+
+        if gate > 0:
             # 使用信號分析器檢查做多信號 - 修正參數順序
             long_signal = self.signal_analyzer.analyze_long_signal(data_4h, data_1h)
             if long_signal.get('signal', False):
                 return 'BUY'
-            
+        else:
             # 檢查做空信號 - 修正參數順序
             short_signal = self.signal_analyzer.analyze_short_signal(data_4h, data_1h)
             if short_signal.get('signal', False):
                 return 'SELL'
-            
-            return 'HOLD'
-            
-        except Exception as e:
-            logger.error(f"信號分析失敗: {e}")
-            return 'HOLD'
+
+        return 'HOLD'
     
+    def analyze_signal_series(self, data_1h: pd.DataFrame, data_4h: pd.DataFrame) -> np.ndarray:
+        """
+        一次算出整段歷史的進場信號序列（回測批次驅動用）
+
+        取代「外層迴圈逐根呼叫 analyze_signal」的模式：直方圖對齊後
+        交給 JIT 核心單趟掃完，無逐根的 pandas 切片與字典建構。
+        analyze_signal 的逐根語義不變，即時路徑照常使用。
+
+        Args:
+            data_1h: 1小時數據（含 MACD 指標）
+            data_4h: 4小時數據（含 MACD 指標，會前向對齊到 1H 索引）
+
+        Returns:
+            int8 陣列（與 data_1h 等長）：1 做多、-1 做空、0 無信號
+        """
+        hist_1h = np.nan_to_num(
+            np.ascontiguousarray(data_1h['macd_histogram'].to_numpy(), dtype=np.float64)
+        )
+        hist_4h = np.nan_to_num(
+            np.ascontiguousarray(
+                data_4h['macd_histogram'].reindex(data_1h.index, method='ffill').to_numpy(),
+                dtype=np.float64
+            )
+        )
+        return self.signal_analyzer.analyze_signal_series(hist_1h, hist_4h)
+
+    def _fetch_ohlcv_incremental(self, interval: str, required: int) -> Optional[pd.DataFrame]:
+        """
+        增量獲取 OHLCV 數據
+
+        已有快取時只以 since=最後一根開盤時間抓取新 K 線（通常 1~2 根），
+        取代每小時重抓 700 根的全量請求；回應的第一根會覆蓋快取中
+        尚未收完的那根。快取接不上（停機造成缺口）時退回全量抓取。
+
+        Args:
+            interval: 時間間隔 ('1h' 或 '4h')
+            required: 全量抓取時的K線數量
+
+        Returns:
+            拼接後的 OHLCV DataFrame 或 None
+        """
+        cached = self._raw_1h if interval == "1h" else self._raw_4h
+        if cached is None or len(cached) == 0:
+            return self.data_provider.get_ohlcv_data(self.symbol, interval, required)
+
+        last_ts = cached.index[-1]
+        since_ms = int(last_ts.value // 1_000_000)
+        interval_ms = int(pd.Timedelta(interval).total_seconds() * 1000)
+        now_ms = int(pd.Timestamp.now(tz='UTC').value // 1_000_000)
+        missing = (now_ms - since_ms) // interval_ms + 2
+
+        new = self.data_provider.get_ohlcv_data(
+            self.symbol, interval, min(missing, 1000), since=since_ms
+        )
+        if new is None or len(new) == 0 or new.index[0] != last_ts:
+            logger.debug("%s 增量更新接不上快取，退回全量抓取", interval)
+            return self.data_provider.get_ohlcv_data(self.symbol, interval, required)
+
+        return pd.concat([cached.iloc[:-1], new]).tail(required)
+
+    @staticmethod
+    def update_all_market_data(strategies: List['MacdTradingStrategy']) -> Dict[str, bool]:
+        """
+        並行更新多個策略實例的市場數據（組合監控用）
+
+        逐一呼叫 update_market_data 會讓整點檢查視窗的耗時隨
+        交易對數量線性成長（N × 網路往返）；REST 抓取是 I/O 密集、
+        requests 在等待時釋放 GIL，以執行緒池同時送出後整批耗時
+        貼近單一往返。
+
+        Args:
+            strategies: 各自綁定不同交易對的策略實例列表
+
+        Returns:
+            {symbol: 是否更新成功}
+        """
+        with ThreadPoolExecutor(max_workers=min(len(strategies), 8)) as executor:
+            futures = {
+                executor.submit(s.update_market_data): s for s in strategies
+            }
+            return {futures[f].symbol: f.result() for f in futures}
+
     def update_market_data(self, warmup_bars=100) -> bool:
         """
         更新市場數據
@@ -210,79 +527,180 @@ class MacdTradingStrategy:
         Returns:
             是否成功更新數據
         """
+        # 獲取足夠的歷史數據以確保技術指標準確
+        required_4h = 200 + warmup_bars
+        required_1h = 500 + warmup_bars
+
+        # 並行獲取 4小時與 1小時數據（兩個請求重疊網路等待時間）
+        # 已有快取時只增量抓取最後一根之後的新 K 線
+        # try 只包網路存取；指標計算的錯誤直接往上拋，保留可追蹤的堆疊
         try:
-            # 獲取足夠的歷史數據以確保技術指標準確
-            required_4h = 200 + warmup_bars
-            required_1h = 500 + warmup_bars
-            
-            # 獲取 4小時數據
-            data_4h_raw = self.data_provider.get_ohlcv_data(
-                self.symbol, "4h", required_4h
-            )
-            if data_4h_raw is None:
-                logger.error("無法獲取 4小時數據")
-                return False
-            
-            # 獲取 1小時數據
-            data_1h_raw = self.data_provider.get_ohlcv_data(
-                self.symbol, "1h", required_1h
-            )
-            if data_1h_raw is None:
-                logger.error("無法獲取 1小時數據")
-                return False
-            
-            # 計算技術指標（使用完整數據）
-            self.data_4h = TechnicalIndicators.calculate_macd(
-                data_4h_raw, config.MACD_FAST, config.MACD_SLOW, config.MACD_SIGNAL
-            )
-            
-            self.data_1h = TechnicalIndicators.calculate_macd(
-                data_1h_raw, config.MACD_FAST, config.MACD_SLOW, config.MACD_SIGNAL
-            )
-            self.data_1h = TechnicalIndicators.calculate_atr(
-                self.data_1h, config.ATR_PERIOD
-            )
-            
-            # 只保留最新的數據（去除過多的歷史數據）
-            self.data_4h = self.data_4h.tail(200)
-            self.data_1h = self.data_1h.tail(500)
-            
-            self.last_update = datetime.now()
-            logger.debug(f"市場數據更新完成 - 4H: {len(self.data_4h)} 筆, 1H: {len(self.data_1h)} 筆")
-            return True
-            
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                future_4h = executor.submit(
+                    self._fetch_ohlcv_incremental, "4h", required_4h
+                )
+                future_1h = executor.submit(
+                    self._fetch_ohlcv_incremental, "1h", required_1h
+                )
+                data_4h_raw = future_4h.result()
+                data_1h_raw = future_1h.result()
         except Exception as e:
-            logger.error(f"更新市場數據失敗: {e}")
+            logger.error("更新市場數據失敗: %s", e)
+            return False
+
+        if data_4h_raw is None:
+            logger.error("無法獲取 4小時數據")
+            return False
+
+        if data_1h_raw is None:
+            logger.error("無法獲取 1小時數據")
             return False
+
+        self._raw_4h = data_4h_raw
+        self._raw_1h = data_1h_raw
+
+        # 計算技術指標（使用完整數據）
+        self.data_4h = TechnicalIndicators.calculate_macd(
+            data_4h_raw, config.MACD_FAST, config.MACD_SLOW, config.MACD_SIGNAL
+        )
+
+        self.data_1h = TechnicalIndicators.calculate_macd(
+            data_1h_raw, config.MACD_FAST, config.MACD_SLOW, config.MACD_SIGNAL
+        )
+        # MACD 一步已產生私有副本，ATR 直接就地補欄位，省一次整框複製
+        self.data_1h = TechnicalIndicators.calculate_atr(
+            self.data_1h, config.ATR_PERIOD, copy=False
+        )
+
+        # 只保留最新的數據（去除過多的歷史數據）
+        self.data_4h = self.data_4h.tail(200)
+        self.data_1h = self.data_1h.tail(500)
+
+        # 索引在入口統一轉成 naive UTC，檢查路徑不再逐次做 tz 判斷/轉換
+        if self.data_4h.index.tz is not None:
+            self.data_4h.index = self.data_4h.index.tz_localize(None)
+        if self.data_1h.index.tz is not None:
+            self.data_1h.index = self.data_1h.index.tz_localize(None)
+
+        self._tail = self._tail_snapshot()
+        self._latest_1h_ts = self.data_1h.index[-1]
+        self._latest_4h_ts = self.data_4h.index[-1]
+
+        self.last_update = datetime.now()
+        logger.debug("市場數據更新完成 - 4H: %d 筆, 1H: %d 筆", len(self.data_4h), len(self.data_1h))
+        return True
     
-    def check_entry_signals(self) -> Optional[dict]:
+    def _tail_snapshot(self) -> Dict[str, np.ndarray]:
+        """
+        建立兩個時間框架關鍵欄位的 numpy 視圖（零拷貝）
+
+        熱路徑上的純量讀取改走 arr[-n] 索引，繞過 pandas 的
+        __getitem__ + 索引器機制；視圖在每次 update_market_data
+        重建數據後刷新，存於 self._tail。
+        """
+        return {
+            'open_1h': self.data_1h['open'].to_numpy(),
+            'high_1h': self.data_1h['high'].to_numpy(),
+            'low_1h': self.data_1h['low'].to_numpy(),
+            'close_1h': self.data_1h['close'].to_numpy(),
+            'hist_1h': self.data_1h['macd_histogram'].to_numpy(),
+            'atr_1h': self.data_1h['atr'].to_numpy(),
+            'hist_4h': self.data_4h['macd_histogram'].to_numpy(),
+        }
+
+    def _get_cached_price(self, max_age: float = 1.0) -> Optional[float]:
+        """
+        獲取當前價格（帶 TTL 快取）
+
+        同一個整點檢查內會多次讀價（信號區塊、進出場、日誌輸出），
+        每次都是一趟網路往返；max_age 秒內的重複呼叫直接回傳快取值，
+        省下數百毫秒延遲並減輕交易所限流壓力。進出場後快取會失效，
+        避免用到成交前的舊價。
+
+        Args:
+            max_age: 快取有效秒數
+
+        Returns:
+            當前價格或 None
+        """
+        now = time.monotonic()
+        if self._price_cache_val is not None and now - self._price_cache_ts < max_age:
+            return self._price_cache_val
+
+        price = self.data_provider.get_current_price(self.symbol)
+        if price is not None:
+            self._price_cache_val = price
+            self._price_cache_ts = now
+        return price
+
+    def _invalidate_price_cache(self):
+        """使價格快取失效（進出場後呼叫）"""
+        self._price_cache_val = None
+
+    def check_entry_signals(self) -> Dict[str, Optional[dict]]:
         """
         檢查進場信號
-        
+
         Returns:
-            信號資訊字典或 None
+            {'active': 觸發的信號字典（含 side）或 None,
+             'long': 做多分析結果或 None,
+             'short': 做空分析結果或 None}
+
+            已執行過的分析結果一併回傳，無信號時的詳細日誌
+            可直接重用，不必對同一批數據重跑一次完整分析。
         """
+        result = {'active': None, 'long': None, 'short': None}
+
         if self.data_4h is None or self.data_1h is None:
-            return None
-        
+            return result
+
         # 如果已有持倉，不檢查新信號
         if self.current_position is not None:
-            return None
-        
-        # 檢查做多信號
-        long_signal = self.signal_analyzer.analyze_long_signal(self.data_4h, self.data_1h)
-        if long_signal['signal']:
-            logger.info("檢測到做多信號")
-            return {**long_signal, 'side': 'long'}
-        
-        # 檢查做空信號
-        short_signal = self.signal_analyzer.analyze_short_signal(self.data_4h, self.data_1h)
-        if short_signal['signal']:
-            logger.info("檢測到做空信號")
-            return {**short_signal, 'side': 'short'}
-        
-        return None
+            return result
+
+        # 快速預判：以編譯後的純量核心檢查是否有零軸穿越，無穿越時直接跳過完整分析
+        tail = self._tail if self._tail is not None else self._tail_snapshot()
+        gate = _macd_signal(
+            float(tail['hist_1h'][-2]), float(tail['hist_1h'][-1]),
+            float(tail['hist_4h'][-1])
+        )
+
+        if gate > 0:
+            # 檢查做多信號
+            long_signal = self.signal_analyzer.analyze_long_signal(self.data_4h, self.data_1h)
+            result['long'] = long_signal
+            if long_signal['signal']:
+                logger.info("檢測到做多信號")
+                result['active'] = {**long_signal, 'side': 'long'}
+        elif gate < 0:
+            # 檢查做空信號
+            short_signal = self.signal_analyzer.analyze_short_signal(self.data_4h, self.data_1h)
+            result['short'] = short_signal
+            if short_signal['signal']:
+                logger.info("檢測到做空信號")
+                result['active'] = {**short_signal, 'side': 'short'}
+
+        return result
     
+    def calculate_position_size(self, current_price: float,
+                                balance: float = None) -> float:
+        """
+        依帳戶餘額計算下單數量
+
+        數量 = 帳戶餘額 × POSITION_SIZE × LEVERAGE / 當前價格；
+        步進位數精度由交易執行器在下單時調整。
+
+        Args:
+            current_price: 當前價格
+            balance: 帳戶餘額（None 時現查；呼叫端可先在背景抓好傳入）
+
+        Returns:
+            下單數量
+        """
+        if balance is None:
+            balance = self.trade_executor.get_account_balance()
+        return balance * config.POSITION_SIZE * config.LEVERAGE / current_price
+
     def execute_entry(self, signal: dict) -> bool:
         """
         執行進場
@@ -293,45 +711,46 @@ class MacdTradingStrategy:
         Returns:
             是否成功進場
         """
+        # 獲取當前價格作為進場價（try 只包網路讀價，其餘計算錯誤直接拋出）
         try:
-            # 獲取當前價格作為進場價
-            current_price = self.data_provider.get_current_price(self.symbol)
-            if current_price is None:
-                current_price = self.data_1h['close'].iloc[-1]
-            
-            # 獲取ATR用於計算停損停利
-            atr = signal.get('atr', self.data_1h['atr'].iloc[-1])
-            
-            # 計算停損停利
-            stop_loss = current_price - (atr * config.STOP_LOSS_MULTIPLIER) if signal['side'] == 'long' else current_price + (atr * config.STOP_LOSS_MULTIPLIER)
-            take_profit = current_price + (atr * config.STOP_LOSS_MULTIPLIER * config.RISK_REWARD_RATIO) if signal['side'] == 'long' else current_price - (atr * config.STOP_LOSS_MULTIPLIER * config.RISK_REWARD_RATIO)
-            
-            # 計算倉位大小
-            position_size = config.POSITION_SIZE
-            
-            # 建立持倉
-            position = Position(
-                side=signal['side'],
-                entry_price=current_price,
-                size=position_size,
-                stop_loss=stop_loss,
-                take_profit=take_profit,
-                timestamp=datetime.now()
-            )
-            
-            self.current_position = position
-            self.positions.append(position)
-            
-            logger.info(f"進場執行成功 - {signal['side'].upper()} "
-                       f"價格: {current_price:.4f} "
-                       f"停損: {stop_loss:.4f} "
-                       f"停利: {take_profit:.4f}")
-            
-            return True
-            
+            current_price = self._get_cached_price()
         except Exception as e:
-            logger.error(f"執行進場失敗: {e}")
+            logger.error("執行進場失敗: %s", e)
             return False
+
+        if current_price is None:
+            current_price = float(self._tail['close_1h'][-1])
+
+        # 獲取ATR用於計算停損停利
+        atr = signal.get('atr')
+        if atr is None:
+            atr = float(self._tail['atr_1h'][-1])
+
+        # 計算停損停利（以方向正負號消除多空分支）
+        side_sign = 1.0 if signal['side'] == 'long' else -1.0
+        stop_loss = current_price - side_sign * atr * self._sl_mult
+        take_profit = current_price + side_sign * atr * self._tp_mult
+
+        # 計算倉位大小
+        position_size = self._position_size
+
+        # 建立持倉
+        position = Position(
+            side=signal['side'],
+            entry_price=current_price,
+            size=position_size,
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+            timestamp=datetime.now()
+        )
+
+        self.current_position = position
+        self._invalidate_price_cache()
+
+        logger.info("進場執行成功 - %s 價格: %.4f 停損: %.4f 停利: %.4f",
+                    signal['side'].upper(), current_price, stop_loss, take_profit)
+
+        return True
     
     def check_exit_conditions(self, use_realtime_price: bool = True) -> Optional[str]:
         """
@@ -349,16 +768,16 @@ class MacdTradingStrategy:
         # 獲取當前價格
         if use_realtime_price:
             # 嘗試獲取即時價格
-            current_price = self.data_provider.get_current_price(self.symbol)
+            current_price = self._get_cached_price()
             if current_price is None:
                 # 如果無法獲取即時價格，使用最新的收盤價
-                current_price = self.data_1h['close'].iloc[-1]
-                logger.debug(f"使用最新收盤價: {current_price:.4f}")
+                current_price = float(self._tail['close_1h'][-1])
+                logger.debug("使用最新收盤價: %.4f", current_price)
             else:
-                logger.debug(f"使用即時價格: {current_price:.4f}")
+                logger.debug("使用即時價格: %.4f", current_price)
         else:
             # 使用最新的收盤價
-            current_price = self.data_1h['close'].iloc[-1]
+            current_price = float(self._tail['close_1h'][-1])
         
         # 檢查停損停利
         stop_condition = self.current_position.check_stop_conditions(current_price)
@@ -377,34 +796,29 @@ class MacdTradingStrategy:
         Returns:
             是否成功出場
         """
+        if self.current_position is None:
+            return False
+
+        # 獲取當前價格（try 只包網路讀價，平倉記帳的錯誤直接拋出）
         try:
-            if self.current_position is None:
-                return False
-            
-            # 獲取當前價格
-            current_price = self.data_provider.get_current_price(self.symbol)
-            if current_price is None:
-                current_price = self.data_1h['close'].iloc[-1]
-            
-            # 平倉
-            self.current_position.close_position(current_price, datetime.now())
-            
-            # 更新統計
-            self.total_pnl += self.current_position.pnl
-            self.trade_count += 1
-            if self.current_position.pnl > 0:
-                self.win_count += 1
-            
-            logger.info(f"出場執行成功 - {reason.upper()} "
-                       f"價格: {current_price:.4f} "
-                       f"損益: {self.current_position.pnl:.4f}")
-            
-            self.current_position = None
-            return True
-            
+            current_price = self._get_cached_price()
         except Exception as e:
-            logger.error(f"執行出場失敗: {e}")
+            logger.error("執行出場失敗: %s", e)
             return False
+
+        if current_price is None:
+            current_price = float(self._tail['close_1h'][-1])
+
+        # 平倉並記錄交易
+        self.current_position.close_position(current_price, datetime.now())
+        self._record_trade(self.current_position)
+
+        logger.info("出場執行成功 - %s 價格: %.4f 損益: %.4f",
+                    reason.upper(), current_price, self.current_position.pnl)
+
+        self.current_position = None
+        self._invalidate_price_cache()
+        return True
     
     def run_strategy(self, duration_hours: float = None, auto_trade: bool = True) -> dict:
         """
@@ -427,25 +841,21 @@ class MacdTradingStrategy:
         # 判斷是否無限運行
         infinite_mode = duration_hours is None or duration_hours <= 0
         
+        # 單一日誌來源：monitor logger 同時掛檔案與控制台 handler，
+        # 每則訊息只格式化一次，不再 print/logger 各寫一份
         if infinite_mode:
-            logger.info("開始運行 MACD 信號監測 - 無限模式")
-            print(f"🚀 啟動 MACD 信號監測 - ♾️ 無限運行模式")
-            print(f"💡 提示：按 Ctrl+C 可以停止監測")
+            logger.info("🚀 啟動 MACD 信號監測 - ♾️ 無限運行模式")
+            logger.info("💡 提示：按 Ctrl+C 可以停止監測")
         else:
-            logger.info(f"開始運行 MACD 信號監測，預計運行 {duration_hours} 小時")
-            print(f"🚀 啟動 MACD 信號監測，預計運行 {duration_hours} 小時")
-        
-        logger.info(f"監測頻率：每小時整點檢查進場信號，持續重試直到獲得正確數據")
+            logger.info(f"🚀 啟動 MACD 信號監測，預計運行 {duration_hours} 小時")
+
+        logger.info("⚡ 監測模式：每小時整點檢查進場信號，持續重試直到獲得正確數據")
         if auto_trade:
-            logger.info(f"模式：自動交易模式 - 檢測到信號後自動執行交易")
-            print(f"⚡ 監測模式：每小時整點檢查進場信號")
-            print(f"🤖 自動交易模式：檢測到信號後自動執行交易")
+            logger.info("🤖 自動交易模式：檢測到信號後自動執行交易")
         else:
-            logger.info(f"模式：純提醒模式 - 不執行實際交易")
-            print(f"⚡ 監測模式：每小時整點檢查進場信號")
-            print(f"📢 純提醒模式：檢測到信號時會提醒，手動下單後讓幣安自動執行")
-        print(f"🎯 交易對：{self.symbol}")
-        print("-" * 80)
+            logger.info("📢 純提醒模式：檢測到信號時會提醒，手動下單後讓幣安自動執行")
+        logger.info(f"🎯 交易對：{self.symbol}")
+        logger.info("-" * 80)
         
         start_time = datetime.now()
         if not infinite_mode:
@@ -453,7 +863,13 @@ class MacdTradingStrategy:
         
         last_entry_check_hour = -1  # 記錄上次檢查進場信號的小時
         signal_count = 0  # 信號計數器
-        
+        consecutive_errors = 0  # 連續錯誤次數（退避用，成功迭代即歸零）
+
+        # 迴圈內反覆讀取的配置常數先提為區域變數（LOAD_FAST 取代屬性查找）
+        sl_multiplier = config.STOP_LOSS_MULTIPLIER
+        risk_reward = config.RISK_REWARD_RATIO
+        position_pct = config.POSITION_SIZE * 100
+
         # 主監測循環
         while True:
             try:
@@ -468,15 +884,12 @@ class MacdTradingStrategy:
                 
                 # 每小時1秒時檢查進場信號
                 current_second = current_time.second
-                if (current_minute == 0 and current_second == 1 and current_hour != last_entry_check_hour):
+                if (current_minute == 0 and current_second >= 1 and current_hour != last_entry_check_hour):
                     # 記錄檢查開始
                     check_time_str = current_time.strftime('%Y-%m-%d %H:%M:%S')
-                    print(f"\n{'='*80}")
-                    print(f"🕐 時間: {check_time_str} | 小時信號檢查 #{current_hour}")
-                    print(f"{'='*80}")
-                    logger.info(f"\n{'='*80}")
-                    logger.info(f"⏰ {check_time_str} - 開始執行每小時信號檢查")
-                    logger.info(f"{'='*80}")
+                    logger.info("\n%s", '=' * 80)
+                    logger.info("⏰ %s - 開始執行每小時信號檢查 #%d", check_time_str, current_hour)
+                    logger.info('=' * 80)
                     # 持續嘗試獲取正確的數據
                     data_acquired = False
                     retry_count = 0
@@ -486,7 +899,7 @@ class MacdTradingStrategy:
                         retry_count += 1
                         
                         if retry_count > 1:
-                            logger.info(f"📡 第 {retry_count} 次嘗試獲取數據...")
+                            logger.info("📡 第 %d 次嘗試獲取數據...", retry_count)
                             # print(f"📡 第 {retry_count} 次嘗試獲取數據...")
                         else:
                             logger.info("📡 開始更新市場數據...")
@@ -498,304 +911,258 @@ class MacdTradingStrategy:
                             
                             if data_validation['valid']:
                                 logger.info("✅ 市場數據更新成功，數據時間驗證通過")
-                                logger.info(f"📅 數據時間範圍: {data_validation['data_info']}")
+                                logger.info("📅 數據時間範圍: %s", data_validation['data_info'])
                                 data_acquired = True
                                 
                                 # 獲取當前價格信息
-                                current_price = self.data_provider.get_current_price(self.symbol)
+                                current_price = self._get_cached_price()
                                 
+                                # 本輪檢查共用的 numpy 視圖（繞過 pandas 純量索引路徑）
+                                tail = self._tail
+
                                 # 獲取1小時K線數據（已完成的）
-                                latest_1h_open = self.data_1h['open'].iloc[-2]
-                                latest_1h_high = self.data_1h['high'].iloc[-2]
-                                latest_1h_low = self.data_1h['low'].iloc[-2]
-                                latest_1h_close = self.data_1h['close'].iloc[-2]
-                                
+                                latest_1h_open = tail['open_1h'][-2]
+                                latest_1h_high = tail['high_1h'][-2]
+                                latest_1h_low = tail['low_1h'][-2]
+                                latest_1h_close = tail['close_1h'][-2]
+
                                 # 獲取已完成K線的 MACD 數據（用於交易判斷）
-                                latest_1h_macd = self.data_1h['macd_histogram'].iloc[-2]  # 已完成的1小時K線
-                                prev_1h_macd = self.data_1h['macd_histogram'].iloc[-3] if len(self.data_1h) > 2 else 0
-                                latest_4h_macd = self.data_4h['macd_histogram'].iloc[-1]  # 4小時當前進行中的
+                                latest_1h_macd = tail['hist_1h'][-2]  # 已完成的1小時K線
+                                prev_1h_macd = tail['hist_1h'][-3] if len(tail['hist_1h']) > 2 else 0
+                                latest_4h_macd = tail['hist_4h'][-1]  # 4小時當前進行中的
                                 
-                                # 獲取1小時K線時間範圍
-                                latest_1h_time = self.data_1h.index[-2]
-                                if hasattr(latest_1h_time, 'tz') and latest_1h_time.tz is not None:
-                                    latest_1h_time = latest_1h_time.tz_localize(None)
-                                latest_1h_time_local = latest_1h_time + timedelta(hours=8)
+                                # 獲取1小時K線時間範圍（索引已在數據更新時轉成 naive UTC）
+                                latest_1h_time_local = self.data_1h.index[-2] + timedelta(hours=8)
                                 time_range_str = f"{latest_1h_time_local.strftime('%H:%M')}-{(latest_1h_time_local + timedelta(hours=1)).strftime('%H:%M')}"
                                 
                                 # 簡化輸出：只顯示關鍵信息
-                                print(f"📊 1H [{time_range_str}] OHLC: ${latest_1h_open:.2f}/{latest_1h_high:.2f}/{latest_1h_low:.2f}/{latest_1h_close:.2f}")
-                                print(f"📈 1H MACD: 當前={latest_1h_macd:.4f}, 前根={prev_1h_macd:.4f}")
-                                print(f"📈 4H MACD: {latest_4h_macd:.4f}")
+                                logger.info("📊 1H [%s] OHLC: $%.2f/%.2f/%.2f/%.2f", time_range_str,
+                                            latest_1h_open, latest_1h_high, latest_1h_low, latest_1h_close)
                                 
-                                logger.info(f"💰 當前市場價格:")
-                                logger.info(f"   即時價格: ${current_price:.4f}" if current_price else "   即時價格: 獲取失敗")
-                                logger.info(f"📊 MACD 指標狀態:")
-                                logger.info(f"   1H MACD 直方圖: {latest_1h_macd:.6f}")
-                                logger.info(f"   4H MACD 直方圖: {latest_4h_macd:.6f}")
+                                logger.info("💰 當前市場價格:")
+                                if current_price:
+                                    logger.info("   即時價格: $%.4f", current_price)
+                                else:
+                                    logger.info("   即時價格: 獲取失敗")
+                                logger.info("📊 MACD 指標狀態:")
+                                logger.info("   1H MACD 直方圖: %.6f", latest_1h_macd)
+                                logger.info("   4H MACD 直方圖: %.6f", latest_4h_macd)
                                 
                                 # 檢查進場信號
                                 logger.info("🔍 開始分析進場信號...")
                                 
-                                signal = self.check_entry_signals()
+                                entry_analysis = self.check_entry_signals()
+                                signal = entry_analysis['active']
                                 if signal:
                                     signal_count += 1
                                     
                                     # 獲取當前價格用於計算建議價格
-                                    current_price = self.data_provider.get_current_price(self.symbol)
+                                    current_price = self._get_cached_price()
                                     if current_price is None:
-                                        current_price = self.data_1h['close'].iloc[-1]
-                                    
+                                        current_price = float(tail['close_1h'][-1])
+
                                     # 獲取ATR並計算建議的停損停利
-                                    atr = signal.get('atr', self.data_1h['atr'].iloc[-1])
+                                    atr = signal.get('atr')
+                                    if atr is None:
+                                        atr = float(tail['atr_1h'][-1])
                                     
                                     signal_type = signal['side'].upper()
-                                    
+
+                                    # 自動交易時先在背景抓帳戶餘額：與下方的價位計算
+                                    # 和日誌輸出重疊一個 REST 往返，縮短信號到下單的延遲
+                                    sizing_pool = None
+                                    balance_future = None
+                                    if auto_trade:
+                                        sizing_pool = ThreadPoolExecutor(max_workers=1)
+                                        balance_future = sizing_pool.submit(
+                                            self.trade_executor.get_account_balance)
+
                                     # 詳細計算過程記錄到log
-                                    logger.info(f"🚨🚨🚨 檢測到 {signal_type} 進場信號！🚨🚨🚨")
-                                    logger.info(f"📊 信號詳細計算過程:")
-                                    logger.info(f"   基礎數據:")
-                                    logger.info(f"   - 當前價格: ${current_price:.4f}")
-                                    logger.info(f"   - ATR 值: {atr:.4f}")
-                                    logger.info(f"   - 停損倍數: {config.STOP_LOSS_MULTIPLIER}")
-                                    logger.info(f"   - 風險報酬比: 1:{config.RISK_REWARD_RATIO}")
-                                    logger.info(f"   - 倉位大小: {config.POSITION_SIZE * 100}%")
+                                    logger.info("🚨🚨🚨 檢測到 %s 進場信號！🚨🚨🚨", signal_type)
+                                    logger.info("📊 信號詳細計算過程:")
+                                    logger.info("   基礎數據:")
+                                    logger.info("   - 當前價格: $%.4f", current_price)
+                                    logger.info("   - ATR 值: %.4f", atr)
+                                    logger.info("   - 停損倍數: %s", sl_multiplier)
+                                    logger.info("   - 風險報酬比: 1:%s", risk_reward)
+                                    logger.info("   - 倉位大小: %s%%", position_pct)
                                     
-                                    if signal['side'] == 'long':
-                                        stop_loss_distance = atr * config.STOP_LOSS_MULTIPLIER
-                                        take_profit_distance = stop_loss_distance * config.RISK_REWARD_RATIO
-                                        suggested_stop_loss = current_price - stop_loss_distance
-                                        suggested_take_profit = current_price + take_profit_distance
-                                        
-                                        logger.info(f"   做多計算:")
-                                        logger.info(f"   - 停損距離 = ATR × 停損倍數 = {atr:.4f} × {config.STOP_LOSS_MULTIPLIER} = {stop_loss_distance:.4f}")
-                                        logger.info(f"   - 停利距離 = 停損距離 × 風報比 = {stop_loss_distance:.4f} × {config.RISK_REWARD_RATIO} = {take_profit_distance:.4f}")
-                                        logger.info(f"   - 停損價格 = 進場價 - 停損距離 = {current_price:.4f} - {stop_loss_distance:.4f} = {suggested_stop_loss:.4f}")
-                                        logger.info(f"   - 停利價格 = 進場價 + 停利距離 = {current_price:.4f} + {take_profit_distance:.4f} = {suggested_take_profit:.4f}")
-                                    else:  # short
-                                        stop_loss_distance = atr * config.STOP_LOSS_MULTIPLIER
-                                        take_profit_distance = stop_loss_distance * config.RISK_REWARD_RATIO
-                                        suggested_stop_loss = current_price + stop_loss_distance
-                                        suggested_take_profit = current_price - take_profit_distance
-                                        
-                                        logger.info(f"   做空計算:")
-                                        logger.info(f"   - 停損距離 = ATR × 停損倍數 = {atr:.4f} × {config.STOP_LOSS_MULTIPLIER} = {stop_loss_distance:.4f}")
-                                        logger.info(f"   - 停利距離 = 停損距離 × 風報比 = {stop_loss_distance:.4f} × {config.RISK_REWARD_RATIO} = {take_profit_distance:.4f}")
-                                        logger.info(f"   - 停損價格 = 進場價 + 停損距離 = {current_price:.4f} + {stop_loss_distance:.4f} = {suggested_stop_loss:.4f}")
-                                        logger.info(f"   - 停利價格 = 進場價 - 停利距離 = {current_price:.4f} - {take_profit_distance:.4f} = {suggested_take_profit:.4f}")
+                                    # 以方向正負號統一多空計算，兩個分支共用同一段紀錄
+                                    side_sign = 1.0 if signal['side'] == 'long' else -1.0
+                                    sign_sl, sign_tp = ('-', '+') if side_sign > 0 else ('+', '-')
+                                    stop_loss_distance = atr * self._sl_mult
+                                    take_profit_distance = stop_loss_distance * risk_reward
+                                    suggested_stop_loss = current_price - side_sign * stop_loss_distance
+                                    suggested_take_profit = current_price + side_sign * take_profit_distance
+
+                                    logger.info("   %s計算:", '做多' if side_sign > 0 else '做空')
+                                    logger.info("   - 停損距離 = ATR × 停損倍數 = %.4f × %s = %.4f",
+                                                atr, sl_multiplier, stop_loss_distance)
+                                    logger.info("   - 停利距離 = 停損距離 × 風報比 = %.4f × %s = %.4f",
+                                                stop_loss_distance, risk_reward, take_profit_distance)
+                                    logger.info("   - 停損價格 = 進場價 %s 停損距離 = %.4f %s %.4f = %.4f",
+                                                sign_sl, current_price, sign_sl, stop_loss_distance, suggested_stop_loss)
+                                    logger.info("   - 停利價格 = 進場價 %s 停利距離 = %.4f %s %.4f = %.4f",
+                                                sign_tp, current_price, sign_tp, take_profit_distance, suggested_take_profit)
                                     
                                     # 計算潛在盈虧
                                     risk_amount = abs(current_price - suggested_stop_loss)
                                     reward_amount = abs(suggested_take_profit - current_price)
                                     actual_risk_reward = reward_amount / risk_amount if risk_amount > 0 else 0
                                     
-                                    logger.info(f"   風險管理:")
-                                    logger.info(f"   - 風險金額: ${risk_amount:.4f}")
-                                    logger.info(f"   - 報酬金額: ${reward_amount:.4f}")
-                                    logger.info(f"   - 實際風報比: 1:{actual_risk_reward:.2f}")
+                                    logger.info("   風險管理:")
+                                    logger.info("   - 風險金額: $%.4f", risk_amount)
+                                    logger.info("   - 報酬金額: $%.4f", reward_amount)
+                                    logger.info("   - 實際風報比: 1:%.2f", actual_risk_reward)
                                     
-                                    # 簡潔的控制台輸出
-                                    print(f"🚨 【{signal_type} 信號】 ${current_price:.2f}")
-                                    print(f"🛡️ 停損: ${suggested_stop_loss:.2f} | 🎯 停利: ${suggested_take_profit:.2f} | 📊 風報比: 1:{actual_risk_reward:.1f}")
-                                    print("=" * 60)
-                                    
-                                    # 如果檢測到做多信號
-                                    if long_analysis['signal']:
-                                        logger.info("✅ 檢測到做多信號")
-                                        print("✅ 檢測到做多信號")
-                                        signal_count += 1
-                                        
-                                        if auto_trade:
-                                            try:
-                                                # 計算交易數量
-                                                current_price = self.trade_executor.get_current_price()
-                                                quantity = self.calculate_position_size(current_price)
-                                                
-                                                # 計算止盈止損價格
-                                                stop_loss = current_price - (atr * config.STOP_LOSS_MULTIPLIER)
-                                                take_profit = current_price + (atr * config.STOP_LOSS_MULTIPLIER * config.RISK_REWARD_RATIO)
-                                                
-                                                # 執行 OTOCO 訂單
-                                                self.trade_executor.place_otoco_order(
-                                                    side='BUY',
-                                                    quantity=quantity,
-                                                    entry_price=current_price,
-                                                    stop_loss=stop_loss,
-                                                    take_profit=take_profit
-                                                )
-                                                logger.info(f"已執行做多交易 - 數量: {quantity}, 價格: {current_price}")
-                                                print(f"🤖 已執行做多交易 - 數量: {quantity}, 價格: {current_price}")
-                                            except Exception as e:
-                                                logger.error(f"執行做多交易失敗: {e}")
-                                                print(f"❌ 執行做多交易失敗: {e}")
-                                    
-                                    # 如果檢測到做空信號
-                                    if short_analysis['signal']:
-                                        logger.info("✅ 檢測到做空信號")
-                                        print("✅ 檢測到做空信號")
-                                        signal_count += 1
-                                        
-                                        if auto_trade:
-                                            try:
-                                                # 計算交易數量
-                                                current_price = self.trade_executor.get_current_price()
-                                                quantity = self.calculate_position_size(current_price)
-                                                
-                                                # 計算止盈止損價格
-                                                stop_loss = current_price - (atr * config.STOP_LOSS_MULTIPLIER)
-                                                take_profit = current_price + (atr * config.STOP_LOSS_MULTIPLIER * config.RISK_REWARD_RATIO)
-                                                
-                                                # 執行 OTOCO 訂單
-                                                self.trade_executor.place_otoco_order(
-                                                    side='SELL',
-                                                    quantity=quantity,
-                                                    entry_price=current_price,
-                                                    stop_loss=stop_loss,
-                                                    take_profit=take_profit
-                                                )
-                                                logger.info(f"已執行做空交易 - 數量: {quantity}, 價格: {current_price}")
-                                                print(f"🤖 已執行做空交易 - 數量: {quantity}, 價格: {current_price}")
-                                            except Exception as e:
-                                                logger.error(f"執行做空交易失敗: {e}")
-                                                print(f"❌ 執行做空交易失敗: {e}")
+                                    logger.info("🚨 【%s 信號】 $%.2f", signal_type, current_price)
+                                    logger.info("🛡️ 停損: $%.2f | 🎯 停利: $%.2f | 📊 風報比: 1:%.1f",
+                                                suggested_stop_loss, suggested_take_profit, actual_risk_reward)
+                                    logger.info("=" * 60)
                                     
+                                    # 自動交易：依信號方向送出一筆 OTOCO 訂單
+                                    # （進場價/停損/停利沿用上方已算好的值，不再重複讀價）
+                                    if auto_trade:
+                                        try:
+                                            order_side = 'BUY' if signal['side'] == 'long' else 'SELL'
+                                            quantity = self.calculate_position_size(
+                                                current_price, balance=balance_future.result())
+
+                                            self.trade_executor.place_otoco_order(
+                                                side=order_side,
+                                                quantity=quantity,
+                                                entry_price=current_price,
+                                                stop_loss=suggested_stop_loss,
+                                                take_profit=suggested_take_profit
+                                            )
+                                            logger.info("🤖 已執行%s交易 - 數量: %s, 價格: %s",
+                                                        signal_type, quantity, current_price)
+                                        except Exception as e:
+                                            logger.error("❌ 執行%s交易失敗: %s", signal_type, e)
+                                        finally:
+                                            sizing_pool.shutdown(wait=False)
+
                                 else:
                                     logger.info("📊 本次檢查無進場信號")
-                                    
-                                    # 獲取詳細的信號分析結果 - 詳細分析記錄到log
-                                    long_analysis = self.signal_analyzer.analyze_long_signal(self.data_4h, self.data_1h)
-                                    short_analysis = self.signal_analyzer.analyze_short_signal(self.data_4h, self.data_1h)
-                                    
-                                    # 詳細分析記錄到日誌
-                                    logger.info("📋 詳細信號分析:")
-                                    
-                                    # 分析做多信號失敗原因
-                                    if 'details' in long_analysis and 'stop_reason' in long_analysis['details']:
-                                        logger.info(f"   做多信號: {long_analysis['details']['stop_reason']}")
-                                        
-                                        # 詳細條件檢查記錄到log
-                                        if 'conditions' in long_analysis:
-                                            for condition, result in long_analysis['conditions'].items():
-                                                status = "✅" if result else "❌"
-                                                if condition == 'step1_first_positive':
-                                                    desc = "1H MACD剛轉正"
-                                                elif condition == 'step2_enough_negative':
-                                                    desc = "前段負值足夠"
-                                                elif condition == 'step3_4h_positive':
-                                                    desc = "4H MACD為正"
-                                                else:
-                                                    desc = condition
-                                                logger.info(f"      {status} {desc}: {result}")
-                                        
-                                        # 連續負值統計記錄到log
-                                        if 'consecutive_negative_count' in long_analysis['details']:
-                                            count = long_analysis['details']['consecutive_negative_count']
-                                            logger.info(f"      前段連續負值: {count}/{config.MIN_CONSECUTIVE_BARS}根")
-                                    
-                                    # 分析做空信號失敗原因
-                                    if 'details' in short_analysis and 'stop_reason' in short_analysis['details']:
-                                        logger.info(f"   做空信號: {short_analysis['details']['stop_reason']}")
-                                        
-                                        # 詳細條件檢查記錄到log
-                                        if 'conditions' in short_analysis:
-                                            for condition, result in short_analysis['conditions'].items():
-                                                status = "✅" if result else "❌"
-                                                if condition == 'step1_first_negative':
-                                                    desc = "1H MACD剛轉負"
-                                                elif condition == 'step2_enough_positive':
-                                                    desc = "前段正值足夠"
-                                                elif condition == 'step3_4h_negative':
-                                                    desc = "4H MACD為負"
-                                                else:
-                                                    desc = condition
-                                                logger.info(f"      {status} {desc}: {result}")
-                                        
-                                        # 連續正值統計記錄到log
-                                        if 'consecutive_positive_count' in short_analysis['details']:
-                                            count = short_analysis['details']['consecutive_positive_count']
-                                            logger.info(f"      前段連續正值: {count}/{config.MIN_CONSECUTIVE_BARS}根")
-                                    
-                                    # 通用MACD狀態分析記錄到log
-                                    prev_1h_macd = self.data_1h['macd_histogram'].iloc[-3] if len(self.data_1h) > 2 else 0
-                                    logger.info(f"   1H MACD: 當前={latest_1h_macd:.6f}, 前一根={prev_1h_macd:.6f}")
-                                    
-                                    # 4小時趨勢分析
+
+                                    # 趨勢標籤供末行摘要使用（與詳細診斷無關，先行計算）
                                     if latest_4h_macd > 0:
-                                        trend_desc = "多頭環境"
-                                        trend_emoji = "📈"
-                                        logger.info(f"   4H MACD > 0，整體偏多頭環境")
+                                        trend_desc, trend_emoji = "多頭環境", "📈"
                                     elif latest_4h_macd < 0:
-                                        trend_desc = "空頭環境"
-                                        trend_emoji = "📉"
-                                        logger.info(f"   4H MACD < 0，整體偏空頭環境")
+                                        trend_desc, trend_emoji = "空頭環境", "📉"
                                     else:
-                                        trend_desc = "趨勢不明"
-                                        trend_emoji = "➡️"
-                                        logger.info(f"   4H MACD 接近 0，趨勢不明確")
-                                        
-                                    if abs(latest_1h_macd) < 0.001:
-                                        logger.info("   1H MACD 直方圖過小，信號強度不足")
-                                    
-                                    # 簡潔的控制台輸出
-                                    print(f"❌ 無信號 | {trend_emoji} {trend_desc} | 1H: {latest_1h_macd:.3f} | 4H: {latest_4h_macd:.1f}")
+                                        trend_desc, trend_emoji = "趨勢不明", "➡️"
+
+                                    # 詳細診斷只在 INFO 生效時才補算與格式化
+                                    # （WARNING 以上的部署整段跳過，近乎零成本）
+                                    if logger.isEnabledFor(logging.INFO):
+                                        # 重用 check_entry_signals 已算好的結果，沒跑過的一側才補算
+                                        long_analysis = entry_analysis['long'] or \
+                                            self.signal_analyzer.analyze_long_signal(self.data_4h, self.data_1h)
+                                        short_analysis = entry_analysis['short'] or \
+                                            self.signal_analyzer.analyze_short_signal(self.data_4h, self.data_1h)
+
+                                        logger.info("📋 詳細信號分析:")
+
+                                        # 多空兩側共用同一段診斷輸出邏輯
+                                        self._log_signal_failure(
+                                            long_analysis, "做多", _LONG_COND_DESC,
+                                            'consecutive_negative_count', "前段連續負值")
+                                        self._log_signal_failure(
+                                            short_analysis, "做空", _SHORT_COND_DESC,
+                                            'consecutive_positive_count', "前段連續正值")
+
+                                        # 通用MACD狀態分析記錄到log
+                                        prev_1h_macd = tail['hist_1h'][-3] if len(tail['hist_1h']) > 2 else 0
+                                        logger.info("   1H MACD: 當前=%.6f, 前一根=%.6f", latest_1h_macd, prev_1h_macd)
+
+                                        # 4小時趨勢分析
+                                        if latest_4h_macd > 0:
+                                            logger.info("   4H MACD > 0，整體偏多頭環境")
+                                        elif latest_4h_macd < 0:
+                                            logger.info("   4H MACD < 0，整體偏空頭環境")
+                                        else:
+                                            logger.info("   4H MACD 接近 0，趨勢不明確")
+
+                                        if abs(latest_1h_macd) < 0.001:
+                                            logger.info("   1H MACD 直方圖過小，信號強度不足")
+
+                                    logger.info("❌ 無信號 | %s %s | 1H: %.3f | 4H: %.1f",
+                                                trend_emoji, trend_desc, latest_1h_macd, latest_4h_macd)
                             else:
-                                logger.warning(f"⚠️ 數據時間驗證失敗 (第{retry_count}次): {data_validation['reason']}")
-                                print(f"⚠️ 數據時間驗證失敗 (第{retry_count}次): {data_validation['reason']}")
-                                
+                                logger.warning("⚠️ 數據時間驗證失敗 (第%d次): %s", retry_count, data_validation['reason'])
+
                                 if retry_count < max_retries:
                                     wait_time = 1  # 等待1秒後重試
-                                    logger.info(f"⏳ 等待 {wait_time} 秒後重試...")
-                                    print(f"⏳ 等待 {wait_time} 秒後重試...")
+                                    logger.info("⏳ 等待 %d 秒後重試...", wait_time)
                                     time.sleep(wait_time)
                         else:
-                            logger.warning(f"❌ 數據更新失敗 (第{retry_count}次)")
-                            print(f"❌ 數據更新失敗 (第{retry_count}次)")
-                            
+                            logger.warning("❌ 數據更新失敗 (第%d次)", retry_count)
+
                             if retry_count < max_retries:
                                 wait_time = 1  # 等待1秒後重試
-                                logger.info(f"⏳ 等待 {wait_time} 秒後重試...")
-                                print(f"⏳ 等待 {wait_time} 秒後重試...")
+                                logger.info("⏳ 等待 %d 秒後重試...", wait_time)
                                 time.sleep(wait_time)
                     
                     if not data_acquired:
-                        logger.error(f"❌ 經過 {max_retries} 次嘗試仍無法獲得正確數據，跳過本次檢查")
-                        print(f"❌ 經過 {max_retries} 次嘗試仍無法獲得正確數據，跳過本次檢查")
+                        logger.error("❌ 經過 %d 次嘗試仍無法獲得正確數據，跳過本次檢查", max_retries)
                     
-                    # 記錄檢查完成
+                    # 記錄檢查完成（只取一次現在時間，後續統計全部重用）
                     last_entry_check_hour = current_hour
                     check_end_time = datetime.now()
                     check_duration = (check_end_time - current_time).total_seconds()
-                    
+
                     # 顯示統計信息
                     next_check_time = current_time.replace(minute=0, second=1, microsecond=0) + timedelta(hours=1)
-                    total_runtime = (datetime.now() - start_time).total_seconds() / 3600
+                    total_runtime = (check_end_time - start_time).total_seconds() / 3600
                     
-                    logger.info(f"✅ 本次檢查完成，耗時 {check_duration:.1f} 秒")
-                    logger.info(f"📈 信號統計: 已檢測到 {signal_count} 個信號")
+                    logger.info("✅ 本次檢查完成，耗時 %.1f 秒", check_duration)
+                    logger.info("📈 信號統計: 已檢測到 %d 個信號", signal_count)
                     
                     if infinite_mode:
-                        logger.info(f"⏰ 已運行時間: {total_runtime:.1f} 小時")
-                        logger.info(f"♾️ 無限監測模式 - 持續運行中")
-                        print(f"🕐 下次檢查: {next_check_time.strftime('%H:%M:%S')} (信號數: {signal_count}, 已運行: {total_runtime:.1f}h)")
+                        logger.info("⏰ 已運行時間: %.1f 小時", total_runtime)
+                        logger.info("🕐 下次檢查: %s (信號數: %d, 已運行: %.1fh)",
+                                    next_check_time.strftime('%H:%M:%S'), signal_count, total_runtime)
                     else:
-                        remaining_time = end_time - datetime.now()
+                        remaining_time = end_time - check_end_time
                         remaining_hours = remaining_time.total_seconds() / 3600
-                        logger.info(f"⏳ 剩餘監測時間: {remaining_hours:.1f} 小時")
-                        print(f"🕐 下次檢查: {next_check_time.strftime('%H:%M:%S')} (信號數: {signal_count}, 剩餘: {remaining_hours:.1f}h)")
-                    
-                    logger.info(f"🕐 下次檢查時間: {next_check_time.strftime('%H:%M:%S')}")
-                    print("✅ 本次檢查完成")
-                
-                # 每1秒檢查一次時間，確保能準確捕捉到整點1秒
-                time.sleep(1)
+                        logger.info("🕐 下次檢查: %s (信號數: %d, 剩餘: %.1fh)",
+                                    next_check_time.strftime('%H:%M:%S'), signal_count, remaining_hours)
                 
+                # 本輪迭代順利完成，重置錯誤退避
+                consecutive_errors = 0
+
+                # 睡到下一個整點1秒：喚醒目標以牆鐘換算一次，倒數計時改用
+                # monotonic 時鐘，NTP 校時/DST 跳變不會拉長或縮短睡眠本身；
+                # 喚醒後迴圈頂部重讀 datetime.now() 對牆鐘做最終校準，
+                # 時鐘真有跳變時由 last_entry_check_hour 防止重複觸發
+                now = datetime.now()
+                next_tick = now.replace(minute=0, second=1, microsecond=0)
+                if next_tick <= now:
+                    next_tick += timedelta(hours=1)
+                # 限時模式：到期時間早於下個整點時以到期時間為準，
+                # 避免睡過頭（短時測試如 test_short_run 依賴此行為準時結束）
+                if not infinite_mode and end_time < next_tick:
+                    next_tick = end_time
+                deadline = time.monotonic() + (next_tick - now).total_seconds()
+                # 以≤1秒分段逼近期限，Ctrl+C 保持靈敏
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0.0:
+                        break
+                    time.sleep(min(1.0, remaining))
+
             except KeyboardInterrupt:
-                logger.info("收到中斷信號，停止信號監測")
-                print("⚠️ 收到中斷信號，停止信號監測")
+                logger.info("⚠️ 收到中斷信號，停止信號監測")
                 break
             except Exception as e:
-                logger.error(f"信號監測錯誤: {e}")
-                print(f"❌ 信號監測錯誤: {e}")
-                time.sleep(60)  # 錯誤後等待1分鐘
+                consecutive_errors += 1
+                # 指數退避 + 抖動：瞬時故障（網路抖動、DNS）幾秒內恢復，
+                # 持續故障逐步拉長間隔（上限300秒），不再對失敗的 API 猛打
+                backoff = min(300.0, 2.0 ** min(consecutive_errors, 8)) + random.uniform(0.0, 1.0)
+                logger.error("❌ 信號監測錯誤 (連續第%d次): %s，%.0f 秒後重試",
+                             consecutive_errors, e, backoff)
+                time.sleep(backoff)
         
         # 記錄監測結束
         end_time = datetime.now()
@@ -804,10 +1171,8 @@ class MacdTradingStrategy:
         logger.info("🏁 信號監測結束")
         if infinite_mode:
             logger.info(f"📊 監測總結: 無限模式運行了 {total_runtime:.1f} 小時，檢測到 {signal_count} 個信號")
-            print(f"🏁 監測結束：運行了 {total_runtime:.1f} 小時，檢測到 {signal_count} 個信號")
         else:
             logger.info(f"📊 監測總結: 運行 {duration_hours} 小時，檢測到 {signal_count} 個信號")
-            print(f"🏁 監測結束：運行 {duration_hours} 小時，檢測到 {signal_count} 個信號")
         
         return {
             'total_signals': signal_count,
@@ -818,6 +1183,34 @@ class MacdTradingStrategy:
             'end_time': end_time.isoformat()
         }
     
+    def _log_signal_failure(self, analysis: dict, side_label: str,
+                            desc_map: dict, count_key: str, count_label: str):
+        """
+        記錄單側信號未成立的診斷明細（多空共用）
+
+        Args:
+            analysis: analyze_long_signal / analyze_short_signal 的結果
+            side_label: "做多" 或 "做空"
+            desc_map: 條件名稱 → 中文描述的查表字典
+            count_key: details 內的連續根數欄位名
+            count_label: 連續根數的顯示標籤
+        """
+        details = analysis.get('details')
+        if not details or 'stop_reason' not in details:
+            return
+
+        logger.info("   %s信號: %s", side_label, details['stop_reason'])
+
+        if 'conditions' in analysis:
+            for condition, result in analysis['conditions'].items():
+                status = "✅" if result else "❌"
+                desc = desc_map.get(condition, condition)
+                logger.info("      %s %s: %s", status, desc, result)
+
+        if count_key in details:
+            logger.info("      %s: %s/%s根",
+                        count_label, details[count_key], config.MIN_CONSECUTIVE_BARS)
+
     def _validate_data_timing(self, check_time: datetime) -> dict:
         """
         驗證數據時間是否正確
@@ -829,37 +1222,28 @@ class MacdTradingStrategy:
             驗證結果字典
         """
         try:
-            # 獲取最新數據的時間戳（API返回的是UTC時間）
-            latest_1h_timestamp = pd.to_datetime(self.data_1h.index[-1])
-            latest_4h_timestamp = pd.to_datetime(self.data_4h.index[-1])
-            
-            # 統一處理時區問題 - 移除時區信息
-            if latest_1h_timestamp.tz is not None:
-                latest_1h_timestamp = latest_1h_timestamp.tz_localize(None)
-            if latest_4h_timestamp.tz is not None:
-                latest_4h_timestamp = latest_4h_timestamp.tz_localize(None)
-            
-            # 確保check_time也沒有時區信息
-            if hasattr(check_time, 'tz') and check_time.tz is not None:
-                check_time = check_time.replace(tzinfo=None)
-            
+            # update_market_data 已把尾端時間戳快取成 naive UTC 的
+            # pd.Timestamp，直接取用，不需索引查找或 tz 轉換
+            latest_1h_timestamp = self._latest_1h_ts
+            latest_4h_timestamp = self._latest_4h_ts
+
             # 將本地時間（UTC+8）轉換為UTC時間進行比較
-            utc_check_time = check_time - timedelta(hours=8)
-            
+            utc_check_time = pd.Timestamp(check_time)
+            if utc_check_time.tz is not None:
+                utc_check_time = utc_check_time.tz_localize(None)
+            utc_check_time -= pd.Timedelta(hours=8)
+
             # ===== 1小時線邏輯 =====
             # 在11:00:01檢查時，API會返回11:00開盤的進行中K線
             # 但我們要用10:00的已完成K線來做交易判斷
             # 所以期望API返回的最新K線是當前小時（11:00）
-            expected_1h_time_utc = utc_check_time.replace(minute=0, second=0, microsecond=0)
-            
-            # ===== 4小時線邏輯修正 =====
+            expected_1h_time_utc = utc_check_time.floor('h')
+
+            # ===== 4小時線邏輯 =====
             # 4小時線開盤時間: 00:00, 04:00, 08:00, 12:00, 16:00, 20:00 (UTC)
             # 對應台灣時間: 08:00, 12:00, 16:00, 20:00, 00:00, 04:00
-            utc_hour = utc_check_time.hour
-            current_4h_start_utc = (utc_hour // 4) * 4
-            expected_4h_time_utc = utc_check_time.replace(
-                hour=current_4h_start_utc, minute=0, second=0, microsecond=0
-            )
+            # floor('4h') 以 UTC 午夜為錨點，正好落在上述週期起點
+            expected_4h_time_utc = utc_check_time.floor('4h')
             
             # 計算時間差（小時為單位）
             time_diff_1h_hours = (latest_1h_timestamp - expected_1h_time_utc).total_seconds() / 3600
@@ -874,14 +1258,10 @@ class MacdTradingStrategy:
             # 格式化時間字符串（轉換為本地時間顯示）
             latest_1h_local = latest_1h_timestamp + timedelta(hours=8)  # UTC轉換為UTC+8
             latest_4h_local = latest_4h_timestamp + timedelta(hours=8)  # UTC轉換為UTC+8
-            expected_1h_local = expected_1h_time_utc + timedelta(hours=8)  # UTC轉換為UTC+8
-            expected_4h_local = expected_4h_time_utc + timedelta(hours=8)  # UTC轉換為UTC+8
-            
+
             latest_1h_str = latest_1h_local.strftime('%m-%d %H:%M')
             latest_4h_str = latest_4h_local.strftime('%m-%d %H:%M')
-            expected_1h_str = expected_1h_local.strftime('%m-%d %H:%M')
-            expected_4h_str = expected_4h_local.strftime('%m-%d %H:%M')
-            
+
             if is_1h_valid and is_4h_valid:
                 return {
                     'valid': True,
@@ -891,21 +1271,29 @@ class MacdTradingStrategy:
                     'reason': None
                 }
             else:
+                # 只在驗證失敗時才格式化期望時間字串（成功路徑不需要，strftime 成本不低）
+                expected_1h_local = expected_1h_time_utc + timedelta(hours=8)  # UTC轉換為UTC+8
+                expected_4h_local = expected_4h_time_utc + timedelta(hours=8)  # UTC轉換為UTC+8
+                expected_1h_str = expected_1h_local.strftime('%m-%d %H:%M')
+                expected_4h_str = expected_4h_local.strftime('%m-%d %H:%M')
+
+                # 後綴各格式化一次，分支只剩標籤選擇與字串串接
                 reason_parts = []
                 if not is_1h_valid:
-                    if abs(time_diff_1h_hours) >= 2.0:
-                        reason_parts.append(f"1H數據延遲過大 (期望: {expected_1h_str}, 實際: {latest_1h_str}, 差異: {time_diff_1h_hours:+.1f}小時)")
-                    else:
-                        reason_parts.append(f"1H數據時間異常 (期望: {expected_1h_str}, 實際: {latest_1h_str}, 差異: {time_diff_1h_hours:+.1f}小時)")
-                
+                    label_1h = "1H數據延遲過大" if abs(time_diff_1h_hours) >= 2.0 else "1H數據時間異常"
+                    suffix_1h = f" (期望: {expected_1h_str}, 實際: {latest_1h_str}, 差異: {time_diff_1h_hours:+.1f}小時)"
+                    reason_parts.append(label_1h + suffix_1h)
+
                 if not is_4h_valid:
                     if time_diff_4h_hours < 0:
-                        reason_parts.append(f"4H數據未更新 (期望當前週期: {expected_4h_str}, 實際: {latest_4h_str}, 差異: {time_diff_4h_hours:+.1f}小時)")
+                        label_4h = "4H數據未更新"
                     elif time_diff_4h_hours >= 4.0:
-                        reason_parts.append(f"4H數據過新 (期望當前週期: {expected_4h_str}, 實際: {latest_4h_str}, 差異: {time_diff_4h_hours:+.1f}小時)")
+                        label_4h = "4H數據過新"
                     else:
-                        reason_parts.append(f"4H數據異常 (期望當前週期: {expected_4h_str}, 實際: {latest_4h_str}, 差異: {time_diff_4h_hours:+.1f}小時)")
-                
+                        label_4h = "4H數據異常"
+                    suffix_4h = f" (期望當前週期: {expected_4h_str}, 實際: {latest_4h_str}, 差異: {time_diff_4h_hours:+.1f}小時)"
+                    reason_parts.append(label_4h + suffix_4h)
+
                 return {
                     'valid': False,
                     'latest_1h_time': latest_1h_str,
@@ -913,8 +1301,9 @@ class MacdTradingStrategy:
                     'data_info': f"1H最新: {latest_1h_str}, 4H最新: {latest_4h_str}",
                     'reason': "; ".join(reason_parts)
                 }
-                
-        except Exception as e:
+
+        # 只攔截數據缺漏/格式問題；程式錯誤（AttributeError 等）直接浮出
+        except (ValueError, KeyError, IndexError) as e:
             return {
                 'valid': False,
                 'latest_1h_time': 'N/A',
@@ -930,69 +1319,252 @@ class MacdTradingStrategy:
         Returns:
             績效統計字典
         """
-        win_rate = (self.win_count / self.trade_count * 100) if self.trade_count > 0 else 0
-        
+        # 交易狀態沒變時直接回傳快取結果
+        if self._summary_cache_n == self.trade_count:
+            return self._summary_cache
+
+        # 總量統計取終身計數器（歷史陣列達上限後只保留近期交易）
+        closed = self._pos_arr[:self._pos_count]
+        total_trades = self.trade_count
+        winning_trades = self.win_count
+        total_pnl = self.total_pnl
+        win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
+
         summary = {
-            'total_trades': self.trade_count,
-            'winning_trades': self.win_count,
-            'losing_trades': self.trade_count - self.win_count,
+            'total_trades': total_trades,
+            'winning_trades': winning_trades,
+            'losing_trades': total_trades - winning_trades,
             'win_rate': win_rate,
-            'total_pnl': self.total_pnl,
-            'average_pnl': self.total_pnl / self.trade_count if self.trade_count > 0 else 0,
-            'positions': [pos.to_dict() for pos in self.positions]
+            'total_pnl': total_pnl,
+            'average_pnl': total_pnl / total_trades if total_trades > 0 else 0,
+            'positions': [
+                {
+                    'side': 'long' if row['side'] > 0 else 'short',
+                    'entry_price': float(row['entry_price']),
+                    'exit_price': float(row['exit_price']),
+                    'size': float(row['size']),
+                    'stop_loss': float(row['stop_loss']),
+                    'take_profit': float(row['take_profit']),
+                    'entry_time': pd.Timestamp(row['entry_time']).isoformat(),
+                    'exit_time': pd.Timestamp(row['exit_time']).isoformat(),
+                    'pnl': float(row['pnl']),
+                    'status': 'closed'
+                }
+                for row in closed
+            ]
         }
-        
-        logger.info(f"策略績效摘要:")
-        logger.info(f"總交易次數: {summary['total_trades']}")
-        logger.info(f"勝率: {summary['win_rate']:.2f}%")
-        logger.info(f"總損益: {summary['total_pnl']:.4f}")
-        
+
+        self._summary_cache = summary
+        self._summary_cache_n = self.trade_count
+
+        # 彙總成單一訊息一次送出（日誌鎖與 write 系統呼叫各只發生一次）
+        logger.info(
+            f"策略績效摘要:\n"
+            f"總交易次數: {total_trades}\n"
+            f"勝率: {win_rate:.2f}%\n"
+            f"總損益: {total_pnl:.4f}"
+        )
+
         # 同時在控制台顯示績效摘要
-        print(f"\n📊 策略績效摘要:")
-        print(f"📈 總交易次數: {summary['total_trades']}")
-        print(f"🎯 勝率: {summary['win_rate']:.2f}%")
-        print(f"💰 總損益: ${summary['total_pnl']:+.4f}")
-        print(f"💵 平均每筆損益: ${summary['average_pnl']:+.4f}")
-        
+        sys.stdout.write(
+            f"\n📊 策略績效摘要:\n"
+            f"📈 總交易次數: {total_trades}\n"
+            f"🎯 勝率: {win_rate:.2f}%\n"
+            f"💰 總損益: ${total_pnl:+.4f}\n"
+            f"💵 平均每筆損益: ${summary['average_pnl']:+.4f}\n"
+        )
+        sys.stdout.flush()
+
         return summary
     
     def backtest(self, start_date: str, end_date: str) -> dict:
         """
         回測策略
-        
+
+        歷史數據一次取回後轉為連續 numpy 陣列（SoA），
+        逐根 K 線的持倉狀態機交由 JIT 編譯的 _run_backtest 核心執行，
+        只為實際成交的記錄建立 Position 物件。
+
         Args:
             start_date: 開始日期 (YYYY-MM-DD)
             end_date: 結束日期 (YYYY-MM-DD)
-            
+
         Returns:
             回測結果
         """
         logger.info(f"開始回測 - 期間: {start_date} 到 {end_date}")
-        
-        # 這裡可以實現詳細的回測邏輯
-        # 由於篇幅限制，這裡提供基本框架
-        
+
         # 獲取歷史數據
-        # 逐步模擬交易
-        # 計算績效指標
-        
+        from ..data.data_provider import get_binance_klines
+        data_1h_raw = get_binance_klines(self.symbol, '1h', start_date, end_date)
+        data_4h_raw = get_binance_klines(self.symbol, '4h', start_date, end_date)
+
+        if data_1h_raw is None or data_4h_raw is None:
+            logger.error("無法獲取回測歷史數據")
+            return self.get_performance_summary()
+
+        # 計算技術指標
+        data_1h = TechnicalIndicators.calculate_macd(data_1h_raw)
+        data_1h = TechnicalIndicators.calculate_atr(data_1h, copy=False)
+        data_4h = TechnicalIndicators.calculate_macd(data_4h_raw)
+
+        # 轉為連續 float64 陣列（SoA），並將 4H 直方圖對齊到每根 1H K 線
+        open_, high, low, close, hist_1h, hist_4h, atr = \
+            _prepare_backtest_arrays(data_1h, data_4h)
+
+        # 執行 JIT 核心（信號偵測與持倉會計都在迴圈內完成）
+        trade_rows = _run_backtest(
+            open_, high, low, close, hist_1h, hist_4h, atr,
+            self.signal_analyzer.min_consecutive_bars,
+            self._sl_mult, self._tp_mult, float(config.POSITION_SIZE)
+        )
+
+        # 只為成交記錄建立 Position 物件並更新統計
+        timestamps = data_1h.index
+        for row in trade_rows:
+            side = 'long' if row[TRADE_SIDE] > 0 else 'short'
+            position = Position(
+                side=side,
+                entry_price=row[TRADE_ENTRY_PX],
+                size=config.POSITION_SIZE,
+                stop_loss=0.0,
+                take_profit=0.0,
+                timestamp=timestamps[int(row[TRADE_ENTRY_IDX])].to_pydatetime()
+            )
+            position.close_position(
+                row[TRADE_EXIT_PX], timestamps[int(row[TRADE_EXIT_IDX])].to_pydatetime()
+            )
+            self._record_trade(position)
+
+        logger.info(f"回測完成 - 共 {len(trade_rows)} 筆交易")
+
         return self.get_performance_summary()
 
 
-def main():
-    """主程式入口"""
+def _prepare_backtest_arrays(data_1h: pd.DataFrame, data_4h: pd.DataFrame):
+    """將指標 DataFrame 轉為 _run_backtest 需要的連續 float64 SoA 陣列"""
+    open_ = np.ascontiguousarray(data_1h['open'].to_numpy(), dtype=np.float64)
+    high = np.ascontiguousarray(data_1h['high'].to_numpy(), dtype=np.float64)
+    low = np.ascontiguousarray(data_1h['low'].to_numpy(), dtype=np.float64)
+    close = np.ascontiguousarray(data_1h['close'].to_numpy(), dtype=np.float64)
+    atr = np.ascontiguousarray(np.nan_to_num(data_1h['atr'].to_numpy()), dtype=np.float64)
+    hist_1h = np.ascontiguousarray(
+        np.nan_to_num(data_1h['macd_histogram'].to_numpy()), dtype=np.float64
+    )
+    hist_4h = np.ascontiguousarray(
+        np.nan_to_num(data_4h['macd_histogram'].reindex(data_1h.index, method='ffill').to_numpy()),
+        dtype=np.float64
+    )
+    return open_, high, low, close, hist_1h, hist_4h, atr
+
+
+def run_single_backtest(data_1h_raw: pd.DataFrame, data_4h_raw: pd.DataFrame,
+                        params: dict) -> dict:
+    """
+    以指定參數在既有歷史數據上跑一次回測
+
+    純函式：不觸碰任何策略實例狀態，可直接丟進 ProcessPoolExecutor。
+    未給的參數取 config 預設值。
+
+    Args:
+        data_1h_raw: 1小時原始 OHLCV DataFrame
+        data_4h_raw: 4小時原始 OHLCV DataFrame
+        params: 參數字典，可覆寫 fast/slow/signal/min_bars/
+                sl_mult/risk_reward/position_size
+
+    Returns:
+        {'params', 'trade_count', 'win_count', 'win_rate', 'total_pnl'}
+    """
+    fast = int(params.get('fast', config.MACD_FAST))
+    slow = int(params.get('slow', config.MACD_SLOW))
+    signal = int(params.get('signal', config.MACD_SIGNAL))
+    min_bars = int(params.get('min_bars', config.MIN_CONSECUTIVE_BARS))
+    sl_mult = float(params.get('sl_mult', config.STOP_LOSS_MULTIPLIER))
+    risk_reward = float(params.get('risk_reward', config.RISK_REWARD_RATIO))
+    position_size = float(params.get('position_size', config.POSITION_SIZE))
+
+    data_1h = TechnicalIndicators.calculate_macd(data_1h_raw, fast, slow, signal)
+    data_1h = TechnicalIndicators.calculate_atr(data_1h, copy=False)
+    data_4h = TechnicalIndicators.calculate_macd(data_4h_raw, fast, slow, signal)
+
+    open_, high, low, close, hist_1h, hist_4h, atr = _prepare_backtest_arrays(data_1h, data_4h)
+    trade_rows = _run_backtest(
+        open_, high, low, close, hist_1h, hist_4h, atr,
+        min_bars, sl_mult, sl_mult * risk_reward, position_size
+    )
+
+    pnl = trade_rows[:, TRADE_PNL]
+    trade_count = len(trade_rows)
+    win_count = int((pnl > 0).sum())
+    return {
+        'params': params,
+        'trade_count': trade_count,
+        'win_count': win_count,
+        'win_rate': (win_count / trade_count * 100) if trade_count else 0.0,
+        'total_pnl': float(pnl.sum()),
+    }
+
+
+def sweep_backtest(data_1h_raw: pd.DataFrame, data_4h_raw: pd.DataFrame,
+                   param_grid: List[dict], max_workers: int = None) -> List[dict]:
+    """
+    多程序平行掃描參數組合
+
+    每組參數的回測彼此獨立（embarrassingly parallel），
+    以 ProcessPoolExecutor 分散到各核心；歷史數據只抓一次、
+    由各 worker 程序各自計算指標與跑 JIT 核心。
+
+    Args:
+        data_1h_raw: 1小時原始 OHLCV DataFrame
+        data_4h_raw: 4小時原始 OHLCV DataFrame
+        param_grid: run_single_backtest 參數字典的列表
+        max_workers: 程序數上限（None 時用 CPU 核心數）
+
+    Returns:
+        與 param_grid 同序的結果列表
+    """
+    worker = partial(run_single_backtest, data_1h_raw, data_4h_raw)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(worker, param_grid))
+
+
+def main(argv=None):
+    """主程式入口
+
+    Args:
+        argv: 命令行參數（預設取 sys.argv）；包裝腳本可傳入自己的參數列表
+    """
+    parser = argparse.ArgumentParser(description="MACD 信號監測系統")
+    parser.add_argument(
+        '--mode', choices=['auto', 'alert'], default=None,
+        help="auto=自動交易模式, alert=純提醒模式（未指定且為互動終端時以選單詢問）"
+    )
+    parser.add_argument(
+        '--smoke-test', action='store_true',
+        help="跑 10 分鐘測試模式後結束（取代過去註解切換 test_short_run 的作法）"
+    )
+    # parse_known_args：包裝腳本（monitor.py、main.py 選單）各有自己的旗標，
+    # 轉呼叫進來時不因本函數不認得的參數而 SystemExit
+    args, _ = parser.parse_known_args(argv)
+
+    if args.smoke_test:
+        test_short_run()
+        return
+
     try:
         # 建立策略實例（使用真實 Binance 數據）
         strategy = MacdTradingStrategy()
-        
-        # 設定運行時間和交易模式
+
         print("🚀 MACD 信號監測系統啟動")
-        print("請選擇運行模式：")
-        print("1. 自動交易模式 - 檢測到信號後自動執行交易")
-        print("2. 純提醒模式 - 只監測信號，不執行交易")
-        mode = input("請輸入選項 (1-2): ").strip()
-        
-        auto_trade = mode == '1'
+        if args.mode is None and sys.stdin.isatty():
+            # 互動終端且未帶參數：保留原本的選單
+            print("請選擇運行模式：")
+            print("1. 自動交易模式 - 檢測到信號後自動執行交易")
+            print("2. 純提醒模式 - 只監測信號，不執行交易")
+            auto_trade = input("請輸入選項 (1-2): ").strip() == '1'
+        else:
+            # 無頭環境（systemd/Docker）或命令行指定模式：不阻塞在 input()
+            auto_trade = args.mode == 'auto'
         
         if auto_trade:
             print("🤖 已選擇自動交易模式")
@@ -1036,8 +1608,5 @@ def test_short_run():
 
 
 if __name__ == "__main__":
-    # 如果想要測試模式（10分鐘），取消下面這行的註解
-    # test_short_run()
-    
-    # 正常運行模式（24小時）
-    main() 
\ No newline at end of file
+    # 測試模式（10分鐘）改用 --smoke-test 參數，不再需要註解切換
+    main()
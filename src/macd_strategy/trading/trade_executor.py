@@ -3,13 +3,14 @@
 處理下單和倉位管理
 """
 
+import json
 import logging
 from typing import Dict, Optional, Tuple
 from binance.client import Client
 from binance.exceptions import BinanceAPIException
 from macd_strategy.core import config
 from ..core.leverage_calculator import LeverageCalculator
-from decimal import Decimal, ROUND_DOWN
+from decimal import Decimal
 import time
 
 # 設定日誌
@@ -22,11 +23,36 @@ logger = logging.getLogger(__name__)
 
 class TradeExecutor:
     """交易執行器"""
-    
+
+    # 交易對濾網快取壽命（秒）：stepSize/tickSize 為靜態資料，極少變動
+    _FILTER_TTL = 3600.0
+    # 現價快取壽命（秒）：單次信號評估內的重複讀價共用同一結果
+    _PRICE_TTL = 1.0
+
     def __init__(self):
         """初始化交易執行器"""
         self.client = Client(config.API_KEY, config.API_SECRET)
         logger.info("使用正式網進行交易")
+
+        # stepSize/tickSize 快取（縮放整數表示），避免每次對齊都打
+        # exchange info，對齊運算也不必經過 Decimal 的任意精度路徑
+        self._step_int: Optional[int] = None
+        self._step_pow = 1
+        self._tick_int: Optional[int] = None
+        self._tick_pow = 1
+        self._tick_decimals = 0
+        self._filters_ts = 0.0
+
+        # 現價快取（monotonic 時鐘 TTL）
+        self._price_cache_val = 0.0
+        self._price_cache_ts = 0.0
+
+        # OTOCO 止盈/止損腿的固定欄位模板：每次下單只補上變動欄位
+        self._otoco_leg_template = {
+            'symbol': config.SYMBOL,
+            'reduceOnly': 'true',
+        }
+
         self.setup_trading()
     
     def setup_trading(self) -> None:
@@ -53,6 +79,9 @@ class TradeExecutor:
                     logger.error(f"設定保證金模式失敗: {e}")
                     raise
 
+            # 預載交易對濾網，下單時的數量/價格對齊不再各打一次 REST
+            self._refresh_filters_if_stale()
+
         except BinanceAPIException as e:
             logger.error(f"設定交易環境失敗: {e}")
             raise
@@ -74,10 +103,11 @@ class TradeExecutor:
         try:
             positions = self.client.futures_position_information(symbol=config.SYMBOL)
             for position in positions:
-                if float(position['positionAmt']) != 0:
+                amt = float(position['positionAmt'])
+                if amt != 0:
                     return {
-                        'side': 'LONG' if float(position['positionAmt']) > 0 else 'SHORT',
-                        'size': abs(float(position['positionAmt'])),
+                        'side': 'LONG' if amt > 0 else 'SHORT',
+                        'size': abs(amt),
                         'entry_price': float(position['entryPrice'])
                     }
             return None
@@ -85,40 +115,92 @@ class TradeExecutor:
             logger.error(f"獲取持倉資訊失敗: {e}")
             raise
     
+    def get_account_snapshot(self) -> Dict:
+        """一次 REST 取得帳戶餘額與持倉（/fapi/v2/account 同時回傳兩者）"""
+        try:
+            account = self.client.futures_account()
+        except BinanceAPIException as e:
+            logger.error(f"獲取帳戶快照失敗: {e}")
+            raise
+
+        balance = 0.0
+        for asset in account.get('assets', []):
+            if asset['asset'] == 'USDT':
+                balance = float(asset['walletBalance'])
+                break
+
+        position = None
+        for pos in account.get('positions', []):
+            if pos['symbol'] == config.SYMBOL:
+                amt = float(pos['positionAmt'])
+                if amt != 0:
+                    position = {
+                        'side': 'LONG' if amt > 0 else 'SHORT',
+                        'size': abs(amt),
+                        'entry_price': float(pos['entryPrice'])
+                    }
+                break
+
+        return {'balance': balance, 'position': position}
+
     def get_current_price(self) -> float:
-        """獲取當前價格"""
+        """獲取當前價格（1 秒 TTL 快取，同一評估內的重複呼叫不再打 REST）"""
+        now = time.monotonic()
+        if self._price_cache_val and now - self._price_cache_ts < self._PRICE_TTL:
+            return self._price_cache_val
         try:
             ticker = self.client.futures_symbol_ticker(symbol=config.SYMBOL)
-            return float(ticker['price'])
+            price = float(ticker['price'])
         except BinanceAPIException as e:
             logger.error(f"獲取當前價格失敗: {e}")
             raise
+        self._price_cache_val = price
+        self._price_cache_ts = now
+        return price
     
-    def adjust_to_step_size(self, quantity: float) -> float:
-        """將數量對齊到交易對允許的 stepSize，並移除多餘小數位"""
+    def _refresh_filters_if_stale(self) -> None:
+        """更新 stepSize/tickSize 快取（逾時才重抓 exchange info）
+
+        濾網以縮放整數存放：如 stepSize "0.001" 存成 (step_int=1, pow=1000)，
+        對齊運算只剩整數除法，Decimal 僅在這裡解析字串時用到一次。
+        """
+        if self._step_int is not None and time.time() - self._filters_ts < self._FILTER_TTL:
+            return
         info = self.client.futures_exchange_info()
         for symbol in info['symbols']:
             if symbol['symbol'] == config.SYMBOL:
                 for f in symbol['filters']:
                     if f['filterType'] == 'LOT_SIZE':
-                        step_size = Decimal(f['stepSize'])
-                        quant = Decimal(str(quantity))
-                        adjusted = (quant // step_size) * step_size
-                        return float(f"{adjusted:.3f}")
-        return quantity
+                        step = Decimal(f['stepSize']).normalize()
+                        decimals = max(0, -step.as_tuple().exponent)
+                        self._step_pow = 10 ** decimals
+                        self._step_int = int(step.scaleb(decimals))
+                    elif f['filterType'] == 'PRICE_FILTER':
+                        tick = Decimal(f['tickSize']).normalize()
+                        self._tick_decimals = max(0, -tick.as_tuple().exponent)
+                        self._tick_pow = 10 ** self._tick_decimals
+                        self._tick_int = int(tick.scaleb(self._tick_decimals))
+                break
+        self._filters_ts = time.time()
+
+    def adjust_to_step_size(self, quantity: float) -> float:
+        """將數量對齊到交易對允許的 stepSize，並移除多餘小數位"""
+        self._refresh_filters_if_stale()
+        if self._step_int is None:
+            return quantity
+        # 微小 epsilon 抵消二進位浮點誤差（如 0.07 * 1000 = 69.999...）
+        units = int(quantity * self._step_pow + 1e-9)
+        adjusted = (units // self._step_int) * self._step_int / self._step_pow
+        return float(f"{adjusted:.3f}")
 
     def adjust_price_to_tick_size(self, price: float) -> float:
         """將價格對齊到交易對允許的 tickSize，並移除多餘小數位"""
-        info = self.client.futures_exchange_info()
-        for symbol in info['symbols']:
-            if symbol['symbol'] == config.SYMBOL:
-                for f in symbol['filters']:
-                    if f['filterType'] == 'PRICE_FILTER':
-                        tick_size = Decimal(f['tickSize'])
-                        p = Decimal(str(price))
-                        adjusted = (p // tick_size) * tick_size
-                        return float(adjusted.quantize(tick_size, rounding=ROUND_DOWN))
-        return price
+        self._refresh_filters_if_stale()
+        if self._tick_int is None:
+            return price
+        units = int(price * self._tick_pow + 1e-9)
+        adjusted = (units // self._tick_int) * self._tick_int / self._tick_pow
+        return float(f"{adjusted:.{self._tick_decimals}f}")
 
     def place_order(self, side: str, quantity: float, leverage: int = None, entry_price: float = None, stop_loss: float = None, take_profit: float = None):
         """下單，可動態設定槓桿、進場價、止損、止盈"""
@@ -191,16 +273,24 @@ class TradeExecutor:
                 price=price
             )
             order_id = order['orderId']
-            # 等主單成交
-            logger.info(f"[OTOCO] 等待主單成交...")
+            # 等主單成交：輪詢間隔指數退避（0.2 秒起、2 秒封頂）
+            # 立即成交的單在零點幾秒內偵測到；久未成交時降低 REST 頻率
+            logger.info("[OTOCO] 等待主單成交...")
             start = time.time()
+            poll_interval = 0.2
+            filled = False
             while time.time() - start < timeout:
                 order_info = self.client.futures_get_order(symbol=config.SYMBOL, orderId=order_id)
                 if order_info['status'] == 'FILLED':
-                    logger.info(f"[OTOCO] 主單已成交，開始掛止盈/止損單")
+                    filled = True
+                    logger.info("[OTOCO] 主單已成交，開始掛止盈/止損單")
                     break
-                time.sleep(1)
-            else:
+                remaining = timeout - (time.time() - start)
+                if remaining <= 0:
+                    break
+                time.sleep(min(poll_interval, remaining))
+                poll_interval = min(poll_interval * 2.0, 2.0)
+            if not filled:
                 logger.warning(f"[OTOCO] 主單在 {timeout} 秒內未成交，停止 OTOCO 流程")
                 return
             # 查詢最新持倉數量
@@ -209,26 +299,35 @@ class TradeExecutor:
                 logger.error(f"[OTOCO] 主單成交後查無持倉，停止掛止盈/止損單")
                 return
             close_qty = position['size']
-            # 掛止盈單
-            self.client.futures_create_order(
-                symbol=config.SYMBOL,
-                side='SELL' if side == 'BUY' else 'BUY',
-                type='TAKE_PROFIT_MARKET',
-                stopPrice=take_profit,
-                quantity=close_qty,
-                reduceOnly=True
-            )
-            logger.info(f"[OTOCO] 已掛止盈單: {take_profit}，數量: {close_qty}")
-            # 掛止損單
-            self.client.futures_create_order(
-                symbol=config.SYMBOL,
-                side='SELL' if side == 'BUY' else 'BUY',
-                type='STOP_MARKET',
-                stopPrice=stop_loss,
-                quantity=close_qty,
-                reduceOnly=True
-            )
-            logger.info(f"[OTOCO] 已掛止損單: {stop_loss}，數量: {close_qty}")
+            close_side = 'SELL' if side == 'BUY' else 'BUY'
+            # 止盈/止損合併成單一批次請求：一次 RTT 掛齊兩腿，
+            # 也縮小「一腿已掛、另一腿失敗」的時間窗
+            qty_str = str(close_qty)
+            batch = [
+                {
+                    **self._otoco_leg_template,
+                    'side': close_side,
+                    'type': 'TAKE_PROFIT_MARKET',
+                    'stopPrice': str(take_profit),
+                    'quantity': qty_str,
+                },
+                {
+                    **self._otoco_leg_template,
+                    'side': close_side,
+                    'type': 'STOP_MARKET',
+                    'stopPrice': str(stop_loss),
+                    'quantity': qty_str,
+                },
+            ]
+            responses = self.client.futures_place_batch_order(batchOrders=json.dumps(batch))
+            # 批次回應逐腿檢查：失敗的元素是 {code, msg} 而非訂單資訊
+            leg_names = ('止盈', '止損')
+            leg_prices = (take_profit, stop_loss)
+            for name, leg_price, resp in zip(leg_names, leg_prices, responses):
+                if 'code' in resp and 'orderId' not in resp:
+                    logger.error(f"[OTOCO] 掛{name}單失敗: {resp.get('msg')} (code={resp.get('code')})")
+                else:
+                    logger.info(f"[OTOCO] 已掛{name}單: {leg_price}，數量: {close_qty}")
         except BinanceAPIException as e:
             logger.error(f"[OTOCO] 下單失敗: {e}")
             raise 
\ No newline at end of file
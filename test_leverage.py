@@ -5,11 +5,21 @@
 
 import sys
 import os
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+# 已安裝（pip install -e .）時走一般匯入；原始 checkout 才補上 src/ 路徑
+try:
+    import macd_strategy  # noqa: F401
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+import logging
+
+import numpy as np
 
 from src.macd_strategy.core.leverage_calculator import LeverageCalculator
 from src.macd_strategy.core import config
 
+log = logging.getLogger(__name__)
+
 def test_leverage_brackets():
     """測試槓桿分級功能"""
     print("🔧 幣安ETHUSDT槓桿分級制度測試")
@@ -29,16 +39,18 @@ def test_leverage_brackets():
         200000000  # $200M - 5x槓桿
     ]
     
-    for value in test_values:
-        bracket = LeverageCalculator.get_leverage_bracket(value)
-        max_lev = LeverageCalculator.calculate_max_leverage(value)
-        mmr = LeverageCalculator.calculate_maintenance_margin_rate(value)
-        
-        print(f"持倉價值: ${value:>12,}")
-        print(f"  最大槓桿: {max_lev:>3}x")
-        print(f"  維持保證金率: {mmr*100:>5.2f}%")
-        print(f"  維持保證金額度: ${bracket['maintenance_amount']:>10,.0f}")
-        print()
+    # 一次批次查表（searchsorted 二分），取代逐值三次查詢
+    max_levs, mmrs, maint_amounts = LeverageCalculator.get_leverage_brackets_vec(test_values)
+
+    # 逗號分組的格式化不便宜：模板解析一次、綁定為本地名稱，迴圈內只做欄位代入
+    row_fmt = ("持倉價值: ${:>12,}\n"
+               "  最大槓桿: {:>3}x\n"
+               "  維持保證金率: {:>5.2f}%\n"
+               "  維持保證金額度: ${:>10,.0f}\n").format
+
+    for value, max_lev, mmr, maint in zip(test_values, max_levs, mmrs, maint_amounts):
+        # 每個情境組一個字串、一次輸出（減少 stdout 鎖定與 flush 次數）
+        print(row_fmt(value, max_lev, mmr * 100, maint))
 
 def test_position_calculation():
     """測試倉位計算功能"""
@@ -50,37 +62,39 @@ def test_position_calculation():
     position_size_ratio = 0.1  # 10% 倉位
     desired_leverage = 100  # 期望100x槓桿
     entry_prices = [3000, 3500, 4000]  # 不同進場價格
-    
-    for price in entry_prices:
-        print(f"進場價格: ${price}")
-        
-        details = LeverageCalculator.calculate_position_details(
-            capital=capital,
-            position_size_ratio=position_size_ratio,
-            desired_leverage=desired_leverage,
-            entry_price=price
-        )
-        
-        print(f"  保證金占用: ${details['margin_used']:>8.2f}")
-        print(f"  期望槓桿: {details['desired_leverage']:>3}x")
-        print(f"  實際槓桿: {details['actual_leverage']:>3}x")
-        print(f"  名義價值: ${details['actual_notional']:>10.2f}")
-        print(f"  持倉數量: {details['position_quantity']:>10.4f} ETH")
-        print(f"  維持保證金率: {details['maintenance_margin_rate']*100:>5.2f}%")
-        print(f"  維持保證金: ${details['maintenance_margin']:>8.2f}")
-        
+
+    # 批次一次算完所有進場價的持倉詳情，迴圈只負責列印
+    batch = LeverageCalculator.calculate_position_details_vec(
+        capital=capital,
+        position_size_ratio=position_size_ratio,
+        desired_leverage=desired_leverage,
+        entry_prices=entry_prices
+    )
+
+    # 多空爆倉價也整批一次算完（兩方向共用中間項）
+    liq_longs, liq_shorts = LeverageCalculator.calculate_liquidation_prices(batch)
+
+    for i, price in enumerate(entry_prices):
+        details = {key: (value[i] if isinstance(value, np.ndarray) else value)
+                   for key, value in batch.items()}
+
         if details['leverage_limited']:
-            print(f"  ⚠️ 槓桿受限: {desired_leverage}x → {details['actual_leverage']}x")
+            limit_line = f"  ⚠️ 槓桿受限: {desired_leverage}x → {details['actual_leverage']}x"
         else:
-            print(f"  ✅ 槓桿無限制")
-        
-        # 計算爆倉價格
-        liq_long = LeverageCalculator.calculate_liquidation_price(price, details, is_long=True)
-        liq_short = LeverageCalculator.calculate_liquidation_price(price, details, is_long=False)
-        
-        print(f"  做多爆倉價: ${liq_long:>8.2f}")
-        print(f"  做空爆倉價: ${liq_short:>8.2f}")
-        print()
+            limit_line = "  ✅ 槓桿無限制"
+
+        # 每個情境組一個字串、一次輸出
+        print(f"進場價格: ${price}\n"
+              f"  保證金占用: ${details['margin_used']:>8.2f}\n"
+              f"  期望槓桿: {details['desired_leverage']:>3}x\n"
+              f"  實際槓桿: {details['actual_leverage']:>3}x\n"
+              f"  名義價值: ${details['actual_notional']:>10.2f}\n"
+              f"  持倉數量: {details['position_quantity']:>10.4f} ETH\n"
+              f"  維持保證金率: {details['maintenance_margin_rate']*100:>5.2f}%\n"
+              f"  維持保證金: ${details['maintenance_margin']:>8.2f}\n"
+              f"{limit_line}\n"
+              f"  做多爆倉價: ${liq_longs[i]:>8.2f}\n"
+              f"  做空爆倉價: ${liq_shorts[i]:>8.2f}\n")
 
 def test_leverage_scaling():
     """測試槓桿縮放情況"""
@@ -98,36 +112,41 @@ def test_leverage_scaling():
     entry_price = 3500
     position_ratio = 0.5  # 50% 倉位（較激進）
     
-    for scenario in test_scenarios:
+    # 所有情境的資金一次廣播計算，迴圈只負責列印
+    capitals = np.array([scenario["capital"] for scenario in test_scenarios], dtype=np.float64)
+    batch = LeverageCalculator.calculate_position_details_vec(
+        capital=capitals,
+        position_size_ratio=position_ratio,
+        desired_leverage=100,
+        entry_prices=entry_price
+    )
+
+    for i, scenario in enumerate(test_scenarios):
         capital = scenario["capital"]
         name = scenario["name"]
-        
-        print(f"{name} (資金: ${capital:,})")
-        
-        details = LeverageCalculator.calculate_position_details(
-            capital=capital,
-            position_size_ratio=position_ratio,
-            desired_leverage=100,
-            entry_price=entry_price
-        )
-        
-        margin = details['margin_used']
-        notional = details['actual_notional']
-        leverage = details['actual_leverage']
-        
-        print(f"  保證金: ${margin:>10.2f} ({position_ratio*100}% 倉位)")
-        print(f"  名義價值: ${notional:>10.2f}")
-        print(f"  實際槓桿: {leverage:>3}x")
-        print(f"  {LeverageCalculator.get_leverage_info_summary(notional)}")
-        
-        if details['leverage_limited']:
-            print(f"  ⚠️ 槓桿受限制")
-        else:
-            print(f"  ✅ 槓桿無限制")
-        print()
+
+        margin = batch['margin_used'][i]
+        notional = batch['actual_notional'][i]
+        leverage = batch['actual_leverage'][i]
+        limit_line = "  ⚠️ 槓桿受限制" if batch['leverage_limited'][i] else "  ✅ 槓桿無限制"
+
+        # 延遲 %-格式化：handler 被過濾掉（或等級高於 INFO）時
+        # 整串浮點格式化完全不會執行；資金欄的千分位先行分組（%-style 不支援）
+        log.info("%s (資金: $%s)\n"
+                 "  保證金: $%10.2f (%s%% 倉位)\n"
+                 "  名義價值: $%10.2f\n"
+                 "  實際槓桿: %3dx\n"
+                 "  %s\n"
+                 "%s\n",
+                 name, format(capital, ','), margin, position_ratio * 100,
+                 notional, leverage,
+                 LeverageCalculator.get_leverage_info_summary(notional), limit_line)
 
 def main():
     """主函數"""
+    # log 輸出走 stdout 並只留訊息本身，與其餘 print 輸出順序一致
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
+
     print("🚀 動態槓桿系統測試")
     print("=" * 70)
     print(f"測試交易對: {config.SYMBOL}")
@@ -5,7 +5,13 @@
 
 import sys
 import os
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+# 已安裝（pip install -e .）時走一般匯入；原始 checkout 才補上 src/ 路徑
+try:
+    import macd_strategy  # noqa: F401
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from concurrent.futures import ThreadPoolExecutor
 
 from macd_strategy.trading.trade_executor import TradeExecutor
 from macd_strategy.core import config
@@ -20,16 +26,18 @@ def test_futures_otoco_order():
         # 初始化交易執行器
         executor = TradeExecutor()
         
-        # 顯示帳戶資訊
-        balance = executor.get_account_balance()
-        print(f"\n💰 帳戶餘額: ${balance:,.2f}")
-        
-        # 獲取當前價格
-        price = executor.get_current_price()
+        # 帳戶快照（餘額+持倉，單次 REST）與現價平行抓取，
+        # 三次序列往返縮成 max(1 往返)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            snapshot_future = pool.submit(executor.get_account_snapshot)
+            price_future = pool.submit(executor.get_current_price)
+            snapshot = snapshot_future.result()
+            price = price_future.result()
+
+        print(f"\n💰 帳戶餘額: ${snapshot['balance']:,.2f}")
         print(f"\n💵 當前價格: ${price:.2f}")
-        
-        # 顯示持倉資訊
-        position = executor.get_position_info()
+
+        position = snapshot['position']
         if position:
             print(f"\n📊 當前持倉: {position}")
         else: